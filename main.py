@@ -5,46 +5,76 @@ Main execution script
 """
 import os
 import sys
-import json
 import time
+import asyncio
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from pathlib import Path
 
+import httpx
+from tqdm import tqdm
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.clients.groq_client import GroqClient
 from src.clients.serp_client import SerpClient
 from src.clients.trends_client import TrendsClient
-from src.agents.keyword_scorer import KeywordScorer
+from src.clients.embedding_client import EmbeddingClient
+from src.clients.http_session import create_session
+from src.agents.keyword_scorer import KeywordScorer, TopNFilter
+from src.cache.kv_cache import KVCache
+from src.cache.seen_store import SeenStore
+from src.utils import fast_json
 from dotenv import load_dotenv
 
 
+def _normalize_keyword(keyword: str) -> str:
+    """Casefold and trim a keyword once, at the source that produced it"""
+    return keyword.casefold().strip(" ?\t\n")
+
+
 class SEOKeywordAgent:
     """Main SEO Keyword Research Agent"""
     
-    def __init__(self):
-        """Initialize the agent with all necessary clients"""
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize the agent with all necessary clients
+        
+        Args:
+            use_cache: Reuse relevance scores and SERP analyses from earlier runs
+        """
         # Load environment variables
         load_dotenv()
         
         # Initialize clients
         print("🚀 Initializing SEO Keyword Research Agent...")
-        self.groq_client = GroqClient()
-        self.serp_client = SerpClient()
-        self.trends_client = TrendsClient()
+        self.cache = KVCache() if use_cache else None
+        self._http = create_session()
+        self.embedder = EmbeddingClient()
+        self.groq_client = GroqClient(cache=self.cache, embedder=self.embedder)
+        self.serp_client = SerpClient(cache=self.cache, session=self._http)
+        self.trends_client = TrendsClient(cache=self.cache)
+        self.seen_store = SeenStore(
+            self.cache,
+            namespace=(self.serp_client.location, self.serp_client.country, self.serp_client.language)
+        ) if use_cache else None
         self.scorer = KeywordScorer()
         
         # Configuration
         self.max_keywords = int(os.getenv('MAX_KEYWORDS', '50'))
         self.expansion_count = int(os.getenv('EXPANSION_COUNT', '30'))
         self.min_relevance = float(os.getenv('MIN_RELEVANCE_SCORE', '0.5'))
-        self.api_delay = float(os.getenv('API_DELAY', '0.5'))
+        self.max_workers = int(os.getenv('SERP_MAX_WORKERS', '10'))
+        self.trends_max_workers = self.trends_client.max_workers  # TRENDS_MAX_WORKERS, sizes its rate limiter too
+        self.relevance_batch_size = int(os.getenv('RELEVANCE_BATCH_SIZE', '25'))
+        self.relevance_max_workers = int(os.getenv('RELEVANCE_MAX_WORKERS', '4'))
         
         print("✅ Agent initialized successfully!\n")
     
-    def research_keywords(self, seed_keyword: str) -> Dict:
+    async def research_keywords(self, seed_keyword: str) -> Dict:
         """
         Complete keyword research workflow
         
@@ -59,51 +89,54 @@ class SEOKeywordAgent:
         print(f"🎯 Starting Keyword Research for: '{seed_keyword}'")
         print(f"{'='*60}\n")
         
-        # Step 1: Keyword Expansion
-        print("📝 Step 1: Expanding keywords with LLM...")
-        llm_keywords = self._expand_keywords_llm(seed_keyword)
-        print(f"   Generated {len(llm_keywords)} variations\n")
-        
-        # Step 2: Get Related Searches from SERP
-        print("🔍 Step 2: Fetching related searches from SERP...")
-        serp_keywords = self._get_serp_suggestions(seed_keyword)
-        print(f"   Found {len(serp_keywords)} SERP suggestions\n")
-        
-        # Step 3: Get Google Trends suggestions
-        print("📈 Step 3: Getting Google Trends data...")
-        trends_keywords = self._get_trends_suggestions(seed_keyword)
-        print(f"   Found {len(trends_keywords)} trending queries\n")
-        
-        # Step 4: Merge and deduplicate
-        print("🔄 Step 4: Merging and deduplicating keywords...")
-        all_keywords = self._merge_keywords(
-            llm_keywords, 
-            serp_keywords, 
-            trends_keywords,
-            seed_keyword
-        )
-        print(f"   Total unique keywords: {len(all_keywords)}\n")
-        
-        # Step 5: Calculate relevance scores
-        print("🎯 Step 5: Calculating relevance scores...")
-        keywords_with_relevance = self._add_relevance_scores(seed_keyword, all_keywords)
-        
-        # Filter by minimum relevance
-        filtered_keywords = [
-            kw for kw in keywords_with_relevance 
-            if kw['relevance_score'] >= self.min_relevance
-        ]
-        print(f"   {len(filtered_keywords)} keywords passed relevance filter\n")
-        
-        # Step 6: Analyze competition (SERP analysis)
-        print("🏆 Step 6: Analyzing competition (this may take a while)...")
-        keywords_with_competition = self._analyze_competition(filtered_keywords)
-        print(f"   Analyzed {len(keywords_with_competition)} keywords\n")
-        
-        # Step 7: Estimate search volumes
-        print("📊 Step 7: Estimating search volumes...")
-        keywords_with_volumes = self._estimate_volumes(keywords_with_competition)
-        print(f"   Estimated volumes for {len(keywords_with_volumes)} keywords\n")
+        # Steps 1-3 are independent and share one HTTP/2 client with the scoring
+        # pipeline, so concurrent SERP requests multiplex over few connections
+        async with self._async_http_client() as client:
+            print("📝 Steps 1-3: Expanding keywords with LLM, fetching SERP and Trends suggestions...")
+            llm_keywords, serp_keywords, trends_keywords = await asyncio.gather(
+                self._expand_keywords_llm(seed_keyword),
+                self._get_serp_suggestions(seed_keyword, client),
+                self._get_trends_suggestions(seed_keyword)
+            )
+            print(f"   Generated {len(llm_keywords)} variations")
+            print(f"   Found {len(serp_keywords)} SERP suggestions")
+            print(f"   Found {len(trends_keywords)} trending queries\n")
+            
+            # Step 4: Merge and deduplicate
+            print("🔄 Step 4: Merging and deduplicating keywords...")
+            all_keywords = self._merge_keywords(
+                llm_keywords, 
+                serp_keywords, 
+                trends_keywords,
+                seed_keyword
+            )
+            print(f"   Total unique keywords: {len(all_keywords)}\n")
+            
+            # Keywords fully scored for this seed in an earlier run skip steps 5-7
+            seen = self.seen_store.fetch_many(
+                _normalize_keyword(seed_keyword),
+                all_keywords
+            ) if self.seen_store else {}
+            misses = [kw for kw in all_keywords if kw not in seen]
+            hits = [kw_data for kw_data in seen.values() if kw_data['relevance_score'] >= self.min_relevance]
+            if seen:
+                print(f"   {len(seen)} keywords already scored in earlier runs\n")
+            
+            # Steps 5-7: Relevance, competition and volume run as a pipeline, so a
+            # keyword moves on to the next stage as soon as it is ready
+            print("🎯 Steps 5-7: Scoring relevance, competition and search volume...")
+            scored, passed_relevance = await self._score_keywords(
+                seed_keyword, 
+                misses,
+                client
+            )
+        
+        # Restore the merge order for stable ranking
+        position = {kw: i for i, kw in enumerate(all_keywords)}
+        keywords_with_volumes = sorted(hits + scored, key=lambda kw_data: position[kw_data['keyword']])
+        passed_relevance += len(hits)
+        print(f"   {passed_relevance} keywords passed relevance filter")
+        print(f"   Analyzed {len(keywords_with_volumes)} keywords\n")
         
         # Step 8: Score and rank keywords
         print("🎖️  Step 8: Scoring and ranking keywords...")
@@ -124,7 +157,7 @@ class SEOKeywordAgent:
             'generated_at': datetime.now().isoformat(),
             'execution_time_seconds': round(execution_time, 2),
             'total_keywords_analyzed': len(all_keywords),
-            'keywords_after_relevance_filter': len(filtered_keywords),
+            'keywords_after_relevance_filter': passed_relevance,
             'top_keywords_count': len(top_keywords),
             'configuration': {
                 'max_keywords': self.max_keywords,
@@ -142,30 +175,49 @@ class SEOKeywordAgent:
         
         return results
     
-    def _expand_keywords_llm(self, seed_keyword: str) -> List[str]:
+    def _async_http_client(self) -> httpx.AsyncClient:
+        """Create the HTTP/2 client shared by one research run"""
+        connections = max(self.max_workers, 1)
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=connections,
+                max_keepalive_connections=connections
+            ),
+            retries=2
+        )
+        
+        return httpx.AsyncClient(transport=transport, timeout=30)
+    
+    async def _expand_keywords_llm(self, seed_keyword: str) -> List[str]:
         """Expand keywords using LLM"""
-        return self.groq_client.generate_keyword_variations(
-            seed_keyword, 
+        variations = await self.groq_client.generate_keyword_variations_async(
+            seed_keyword,
             count=self.expansion_count
         )
+        return list(dict.fromkeys(map(_normalize_keyword, variations)))
     
-    def _get_serp_suggestions(self, seed_keyword: str) -> List[str]:
+    async def _get_serp_suggestions(
+        self, 
+        seed_keyword: str, 
+        client: httpx.AsyncClient
+    ) -> List[str]:
         """Get keyword suggestions from SERP API"""
-        related = self.serp_client.get_related_searches(seed_keyword)
-        paa = self.serp_client.get_people_also_ask(seed_keyword)
-        
-        # Combine and clean
-        all_suggestions = related + paa
-        cleaned = [kw.lower().strip('?') for kw in all_suggestions]
+        related, paa = await asyncio.gather(
+            self.serp_client.get_related_searches_async(seed_keyword, client),
+            self.serp_client.get_people_also_ask_async(seed_keyword, client)
+        )
         
-        return cleaned
+        # Combine, clean and deduplicate (order preserved)
+        return list(dict.fromkeys(map(_normalize_keyword, chain(related, paa))))
     
-    def _get_trends_suggestions(self, seed_keyword: str) -> List[str]:
+    async def _get_trends_suggestions(self, seed_keyword: str) -> List[str]:
         """Get suggestions from Google Trends"""
         if not self.trends_client.enabled:
             return []
         
-        return self.trends_client.get_related_queries(seed_keyword)
+        queries = await self.trends_client.get_related_queries_async(seed_keyword)
+        return list(dict.fromkeys(map(_normalize_keyword, queries)))
     
     def _merge_keywords(
         self, 
@@ -175,111 +227,217 @@ class SEOKeywordAgent:
         seed_kw: str
     ) -> List[str]:
         """Merge and deduplicate keywords"""
-        # Combine all sources
-        all_keywords = llm_kw + serp_kw + trends_kw
-        
-        # Add seed keyword
-        all_keywords.append(seed_kw.lower())
+        # Sources are already normalized; only the seed still needs it.
+        # Deduplicate while preserving order
+        merged = chain(llm_kw, serp_kw, trends_kw, [_normalize_keyword(seed_kw)])
         
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_keywords = []
-        
-        for kw in all_keywords:
-            kw_clean = kw.lower().strip()
-            if kw_clean and kw_clean not in seen and len(kw_clean) > 3:
-                seen.add(kw_clean)
-                unique_keywords.append(kw_clean)
-        
-        return unique_keywords
+        return list(dict.fromkeys(kw for kw in merged if len(kw) > 3))
     
-    def _add_relevance_scores(self, seed_keyword: str, keywords: List[str]) -> List[Dict]:
-        """Add relevance scores to keywords"""
-        keywords_data = []
+    async def _score_keywords(
+        self, 
+        seed_keyword: str, 
+        keywords: List[str], 
+        client: httpx.AsyncClient
+    ) -> Tuple[List[Dict], int]:
+        """
+        Score keywords through a relevance -> volume -> competition pipeline
         
-        # Batch calculate relevance for efficiency
-        batch_size = 10
-        for i in range(0, len(keywords), batch_size):
-            batch = keywords[i:i + batch_size]
-            scores = self.groq_client.batch_calculate_relevance(seed_keyword, batch)
-            
-            for kw in batch:
-                keywords_data.append({
-                    'keyword': kw,
-                    'relevance_score': scores.get(kw, 0.5)
-                })
-            
-            # Rate limiting
-            if i + batch_size < len(keywords):
-                time.sleep(0.5)
+        Each stage has its own queue and pool of workers. Keywords below the
+        relevance threshold are dropped at the first stage and never reach
+        the SERP or Trends APIs. Keywords that cannot reach the top results
+        whatever their competition skip SERP analysis; the rest move on as
+        soon as their volume is known.
         
-        return keywords_data
-    
-    def _analyze_competition(self, keywords_data: List[Dict]) -> List[Dict]:
-        """Analyze competition for keywords"""
-        for i, kw_data in enumerate(keywords_data):
-            keyword = kw_data['keyword']
+        Args:
+            seed_keyword: The seed keyword being researched
+            keywords: Merged candidate keywords
+            client: Shared httpx client for SERP requests
             
-            print(f"   Analyzing {i+1}/{len(keywords_data)}: {keyword[:50]}...")
+        Returns:
+            Tuple of (scored keywords, count that passed relevance)
+        """
+        relevance_queue = asyncio.Queue()
+        volume_queue = asyncio.Queue()
+        competition_queue = asyncio.Queue()
+        fallbacks = set()
+        top_filter = TopNFilter(self.scorer, self.max_keywords)
+        scored = []
+        passed = 0
+        
+        # One progress bar per stage; downstream totals grow as keywords are admitted
+        relevance_bar = tqdm(total=len(keywords), desc='   Relevance', unit='kw')
+        volume_bar = tqdm(total=0, desc='   Volume', unit='kw')
+        serp_bar = tqdm(total=0, desc='   SERP', unit='kw')
+        
+        def admit(keyword: str, score: float):
+            """Send keywords that pass the relevance filter to the volume stage"""
+            nonlocal passed
+            relevance_bar.update(1)
+            if score >= self.min_relevance:
+                passed += 1
+                volume_bar.total += 1
+                volume_bar.refresh()
+                volume_queue.put_nowait({'keyword': keyword, 'relevance_score': score})
+        
+        def analyze(kw_data: Dict):
+            """Send a keyword that can still make the top results to the competition stage"""
+            serp_bar.total += 1
+            serp_bar.refresh()
+            competition_queue.put_nowait(kw_data)
+        
+        # Cached and paraphrase-cached scores are resolved inside the Groq client
+        batch_size = max(self.relevance_batch_size, 1)
+        for i in range(0, len(keywords), batch_size):
+            relevance_queue.put_nowait(keywords[i:i + batch_size])
+        
+        # SERP requests are paced by the client's rate limiter, not a fixed delay
+        serp_workers = max(self.max_workers, 1)
+        trends_workers = max(self.trends_max_workers, 1)
+        
+        async def relevance_worker():
+            while True:
+                chunk = await relevance_queue.get()
+                try:
+                    try:
+                        scores = await self.groq_client.batch_calculate_relevance_async(seed_keyword, chunk)
+                    except Exception as e:
+                        tqdm.write(f"   ⚠️  Error scoring relevance: {str(e)}")
+                        scores = {}
+                    
+                    for kw in chunk:
+                        if kw not in scores:
+                            # Defaulted score, retried next run
+                            fallbacks.add(kw)
+                        admit(kw, scores.get(kw, 0.5))
+                finally:
+                    relevance_queue.task_done()
+        
+        async def competition_worker():
+            while True:
+                kw_data = await competition_queue.get()
+                try:
+                    keyword = kw_data['keyword']
+                    try:
+                        analysis = await self.serp_client.analyze_competition_async(keyword, client)
+                    except Exception as e:
+                        tqdm.write(f"   ⚠️  Error analyzing {keyword}: {str(e)}")
+                        # Fall back to default values
+                        analysis = {}
+                    
+                    if not analysis or 'error' in analysis:
+                        fallbacks.add(keyword)
+                    self._apply_competition(kw_data, analysis)
+                    serp_bar.update(1)
+                    scored.append(kw_data)
+                finally:
+                    competition_queue.task_done()
+        
+        async def volume_worker(executor: ThreadPoolExecutor):
+            loop = asyncio.get_running_loop()
+            while True:
+                kw_data = await volume_queue.get()
+                try:
+                    try:
+                        # pytrends is blocking, run it on the thread pool
+                        kw_data.update(
+                            await loop.run_in_executor(executor, self._volume_for, kw_data['keyword'])
+                        )
+                    except Exception as e:
+                        tqdm.write(f"   ⚠️  Error estimating volume for {kw_data['keyword']}: {str(e)}")
+                        kw_data['estimated_volume'] = 1000  # Default
+                        fallbacks.add(kw_data['keyword'])
+                        kw_data['trend'] = 'stable'
+                        if self.trends_client.enabled:
+                            kw_data['average_interest'] = 50
+                    
+                    volume_bar.update(1)
+                    for ready in top_filter.add(kw_data):
+                        analyze(ready)
+                finally:
+                    volume_queue.task_done()
+        
+        async def join(queue: asyncio.Queue, workers: List[asyncio.Task]):
+            """Wait for a stage to drain, re-raising a worker crash instead of hanging"""
+            drained = asyncio.ensure_future(queue.join())
+            await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+            if not drained.done():
+                drained.cancel()
+                # Workers loop forever, so a finished worker has crashed
+                for worker in workers:
+                    if worker.done():
+                        worker.result()
+        
+        with ThreadPoolExecutor(max_workers=trends_workers) as executor:
+            workers = (
+                [asyncio.create_task(relevance_worker())
+                 for _ in range(max(self.relevance_max_workers, 1))] +
+                [asyncio.create_task(volume_worker(executor))
+                 for _ in range(trends_workers)] +
+                [asyncio.create_task(competition_worker())
+                 for _ in range(serp_workers)]
+            )
             
             try:
-                analysis = self.serp_client.analyze_competition(keyword)
+                # A stage can only drain once every stage upstream of it has
+                await join(relevance_queue, workers)
+                await join(volume_queue, workers)
                 
-                # Add competition data to keyword
-                kw_data.update({
-                    'competition_score': analysis.get('competition_score', 50),
-                    'big_brands_count': analysis.get('big_brands_count', 0),
-                    'has_featured_snippet': analysis.get('has_featured_snippet', False),
-                    'has_knowledge_graph': analysis.get('has_knowledge_graph', False),
-                    'has_ads': analysis.get('has_ads', False),
-                    'first_page_probability': analysis.get('first_page_probability', 0.5),
-                    'total_results': analysis.get('total_results', 0),
-                    'serp_features_count': analysis.get('serp_features_count', 0),
-                    'top_domains': analysis.get('domains', [])[:5]
-                })
+                # Keywords held back in case they could be ruled out go last
+                for kw_data in top_filter.drain():
+                    analyze(kw_data)
+                if top_filter.pruned:
+                    tqdm.write(f"   {top_filter.pruned} keywords cannot reach the top {self.max_keywords}, skipping SERP analysis")
+                await join(competition_queue, workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
                 
-            except Exception as e:
-                print(f"   ⚠️  Error analyzing {keyword}: {str(e)}")
-                # Add default values
-                kw_data.update({
-                    'competition_score': 50,
-                    'big_brands_count': 0,
-                    'has_featured_snippet': False,
-                    'has_knowledge_graph': False,
-                    'has_ads': False,
-                    'first_page_probability': 0.5,
-                    'total_results': 0,
-                    'serp_features_count': 0,
-                    'top_domains': []
-                })
-            
-            # Rate limiting
-            if i < len(keywords_data) - 1:
-                time.sleep(self.api_delay)
+                for bar in (relevance_bar, volume_bar, serp_bar):
+                    bar.close()
         
-        return keywords_data
-    
-    def _estimate_volumes(self, keywords_data: List[Dict]) -> List[Dict]:
-        """Estimate search volumes"""
-        for kw_data in keywords_data:
-            keyword = kw_data['keyword']
-            
-            try:
-                volume = self.trends_client.estimate_search_volume(keyword)
-                kw_data['estimated_volume'] = volume
-                
-                # Get trend data
-                if self.trends_client.enabled:
-                    interest_data = self.trends_client.get_interest_over_time(keyword)
-                    kw_data['trend'] = interest_data.get('trend', 'stable')
-                    kw_data['average_interest'] = interest_data.get('average_interest', 50)
-                
-            except Exception as e:
-                print(f"   ⚠️  Error estimating volume for {keyword}: {str(e)}")
-                kw_data['estimated_volume'] = 1000  # Default
-                kw_data['trend'] = 'stable'
+        # Persist the paraphrase caches filled during this run
+        self.groq_client.save_semantic_caches()
+        
+        # Keywords scored on fallback values are retried next run
+        if self.seen_store is not None:
+            self.seen_store.store_many(
+                _normalize_keyword(seed_keyword),
+                [kw_data for kw_data in scored if kw_data['keyword'] not in fallbacks]
+            )
         
-        return keywords_data
+        return scored, passed
+    
+    def _apply_competition(self, kw_data: Dict, analysis: Dict):
+        """Add competition data to keyword"""
+        kw_data.update({
+            'competition_score': analysis.get('competition_score', 50),
+            'big_brands_count': analysis.get('big_brands_count', 0),
+            'has_featured_snippet': analysis.get('has_featured_snippet', False),
+            'has_knowledge_graph': analysis.get('has_knowledge_graph', False),
+            'has_ads': analysis.get('has_ads', False),
+            'first_page_probability': analysis.get('first_page_probability', 0.5),
+            'total_results': analysis.get('total_results', 0),
+            'serp_features_count': analysis.get('serp_features_count', 0),
+            'top_domains': list(dict.fromkeys(analysis.get('domains', [])))[:5]
+        })
+    
+    def _volume_for(self, keyword: str) -> Dict:
+        """Fetch volume and trend fields for a single keyword"""
+        if not self.trends_client.enabled:
+            return {'estimated_volume': self.trends_client.estimate_search_volume(keyword)}
+        
+        # Get trend data; the client answers failures with flagged defaults
+        interest_data = self.trends_client.get_interest_over_time(keyword)
+        if 'error' in interest_data:
+            raise RuntimeError(interest_data['error'])
+        
+        return {
+            # Reuses the interest fetched above
+            'estimated_volume': self.trends_client.estimate_search_volume(keyword),
+            'trend': interest_data.get('trend', 'stable'),
+            'average_interest': interest_data.get('average_interest', 50)
+        }
     
     def save_results(self, results: Dict, output_dir: str = "output"):
         """Save results to file"""
@@ -291,9 +449,9 @@ class SEOKeywordAgent:
         seed = results['seed_keyword'].replace(' ', '_')
         filename = f"{output_dir}/keywords_{seed}_{timestamp}.json"
         
-        # Save JSON
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # Save JSON (orjson when available, written as UTF-8 bytes)
+        with open(filename, 'wb') as f:
+            f.write(fast_json.dumps(results, indent=True))
         
         print(f"💾 Results saved to: {filename}")
         
@@ -358,19 +516,24 @@ def main():
         action='store_true',
         help='Do not save results to file'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore cached relevance scores and SERP analyses'
+    )
     
     args = parser.parse_args()
     
     try:
         # Initialize agent
-        agent = SEOKeywordAgent()
+        agent = SEOKeywordAgent(use_cache=not args.no_cache)
         
         # Override max keywords if specified
         if args.limit:
             agent.max_keywords = args.limit
         
         # Run research
-        results = agent.research_keywords(args.seed)
+        results = asyncio.run(agent.research_keywords(args.seed))
         
         # Print summary
         agent.print_summary(results)
@@ -384,7 +547,7 @@ def main():
         print(f"{'='*60}\n")
         
         return 0
-        
+    
     except KeyboardInterrupt:
         print("\n\n⚠️  Research interrupted by user.")
         return 1
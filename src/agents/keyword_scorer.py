@@ -2,8 +2,44 @@
 Keyword Scoring Algorithm
 """
 import os
-from typing import Dict, List
+import heapq
 import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# total_results above each threshold adds 10 difficulty points
+_TOTAL_RESULTS_THRESHOLDS = np.array([1_000_000, 10_000_000, 100_000_000], dtype=np.float64)
+
+# Metric columns used for scoring, with the default for keywords missing one
+_METRIC_DEFAULTS = {
+    'estimated_volume': 1000,
+    'competition_score': 50,
+    'relevance_score': 0.5,
+    'total_results': 0
+}
+
+# Ranking-potential ladders: bisect_right(thresholds, value) indexes the table
+_DIFF_THRESH = (30, 50, 70, 85)
+_DIFF_TABLE = (
+    ("Low", "Easy to rank with quality content"),
+    ("Medium-Low", "Good opportunity with moderate effort"),
+    ("Medium", "Requires strong content and backlinks"),
+    ("Medium-High", "Challenging, needs authority and optimization"),
+    ("High", "Very difficult, dominated by major brands")
+)
+_OPPORTUNITY_THRESH = (45, 60, 75)
+_OPPORTUNITY_TABLE = ("Poor", "Fair", "Good", "Excellent")
+
+# Reasoning ladders (volume thresholds are exclusive, so it uses bisect_left)
+_VOLUME_THRESH = (1000, 5000)
+_VOLUME_TABLE = ("low", "moderate", "high")
+_COMPETITION_THRESH = (30, 50)
+_COMPETITION_TABLE = ("low competition", "moderate competition", "high competition")
+_RELEVANCE_THRESH = (0.6, 0.8)
+_RELEVANCE_TABLE = ("loosely related", "moderately relevant", "highly relevant to seed keyword")
 
 
 class KeywordScorer:
@@ -66,6 +102,49 @@ class KeywordScorer:
         
         return round(opportunity_score, 2)
     
+    def _opportunity_scores(
+        self, 
+        volumes: np.ndarray, 
+        competitions: np.ndarray, 
+        relevances: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized opportunity score over arrays of keyword metrics
+        
+        Args:
+            volumes: Estimated monthly search volumes
+            competitions: Competition scores (0-100)
+            relevances: Relevance scores (0-1)
+            
+        Returns:
+            Opportunity scores (0-100), rounded to 2 decimals
+        """
+        # Normalize volume (diminishing returns at scale)
+        # Use square root to reduce impact of very high volumes
+        volume_normalized = np.minimum(np.sqrt(volumes) / 10, 100)
+        
+        # Inverse competition (lower competition = higher score)
+        competition_scores = 100 - competitions
+        
+        # Relevance to 0-100 scale
+        relevance_scores = relevances * 100
+        
+        # Calculate weighted opportunity score
+        opportunity_scores = (
+            (volume_normalized * self.volume_weight) +
+            (competition_scores * self.competition_weight) +
+            (relevance_scores * self.relevance_weight)
+        )
+        
+        # np.round can land on the other side of x.xx5 than round(); settle the
+        # values that close to a tie with round() so they match the scalar path
+        rounded = np.round(opportunity_scores, 2)
+        scaled = opportunity_scores * 100
+        for i in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6).tolist():
+            rounded[i] = round(float(opportunity_scores[i]), 2)
+        
+        return rounded
+    
     def calculate_keyword_difficulty(self, serp_analysis: Dict) -> int:
         """
         Calculate keyword difficulty (0-100)
@@ -101,6 +180,62 @@ class KeywordScorer:
         
         return min(difficulty, 100)
     
+    def calculate_keyword_difficulty_batch(self, serp_analyses: List[Dict]) -> np.ndarray:
+        """
+        Calculate keyword difficulty (0-100) for many keywords at once
+        
+        Args:
+            serp_analyses: SERP analysis data, one dict per keyword
+            
+        Returns:
+            Integer array of difficulty scores (0 = easiest, 100 = hardest)
+        """
+        count = len(serp_analyses)
+        
+        # Big brands factor (0-40 points)
+        big_brands = np.fromiter(
+            (d.get('big_brands_count', 0) for d in serp_analyses), dtype=np.int64, count=count
+        )
+        brand_points = np.minimum(big_brands * 8, 40)
+        
+        # SERP features factor (0-30 points): 10 per feature present
+        features = np.fromiter(
+            (
+                bool(d.get('has_featured_snippet', False)) +
+                bool(d.get('has_knowledge_graph', False)) +
+                bool(d.get('has_ads', False))
+                for d in serp_analyses
+            ),
+            dtype=np.int64,
+            count=count
+        )
+        feature_points = features * 10
+        
+        # Total results factor (0-30 points): 10 per threshold exceeded
+        totals = self._metric(serp_analyses, 'total_results')
+        total_points = np.searchsorted(_TOTAL_RESULTS_THRESHOLDS, totals) * 10
+        
+        return np.minimum(brand_points + feature_points + total_points, 100)
+    
+    @staticmethod
+    def _metric(records: List[Dict], field: str) -> np.ndarray:
+        """
+        Gather one scoring metric of many keywords into a column
+        
+        Args:
+            records: Keyword or SERP analysis dictionaries
+            field: Metric name, a key of _METRIC_DEFAULTS
+            
+        Returns:
+            Float array with one value per record
+        """
+        default = _METRIC_DEFAULTS[field]
+        return np.fromiter(
+            (record.get(field, default) for record in records),
+            dtype=np.float64,
+            count=len(records)
+        )
+    
     def estimate_ranking_potential(self, keyword_data: Dict) -> Dict:
         """
         Estimate ranking potential with detailed breakdown
@@ -112,41 +247,38 @@ class KeywordScorer:
             Dictionary with ranking assessment
         """
         competition = keyword_data.get('competition_score', 50)
-        first_page_prob = keyword_data.get('first_page_probability', 0.5)
         opportunity = keyword_data.get('opportunity_score', 50)
         
-        # Determine difficulty category
-        if competition < 30:
-            difficulty_category = "Low"
-            difficulty_description = "Easy to rank with quality content"
-        elif competition < 50:
-            difficulty_category = "Medium-Low"
-            difficulty_description = "Good opportunity with moderate effort"
-        elif competition < 70:
-            difficulty_category = "Medium"
-            difficulty_description = "Requires strong content and backlinks"
-        elif competition < 85:
-            difficulty_category = "Medium-High"
-            difficulty_description = "Challenging, needs authority and optimization"
-        else:
-            difficulty_category = "High"
-            difficulty_description = "Very difficult, dominated by major brands"
-        
-        # Determine opportunity rating
-        if opportunity >= 75:
-            opportunity_rating = "Excellent"
-        elif opportunity >= 60:
-            opportunity_rating = "Good"
-        elif opportunity >= 45:
-            opportunity_rating = "Fair"
-        else:
-            opportunity_rating = "Poor"
+        return self._ranking_potential(
+            keyword_data,
+            bisect_right(_DIFF_THRESH, competition),
+            bisect_right(_OPPORTUNITY_THRESH, opportunity)
+        )
+    
+    def _ranking_potential(
+        self, 
+        keyword_data: Dict, 
+        difficulty_idx: int, 
+        opportunity_idx: int
+    ) -> Dict:
+        """
+        Build the ranking assessment from precomputed ladder positions
+        
+        Args:
+            keyword_data: Complete keyword data
+            difficulty_idx: Index into the difficulty table
+            opportunity_idx: Index into the opportunity table
+            
+        Returns:
+            Dictionary with ranking assessment
+        """
+        difficulty_category, difficulty_description = _DIFF_TABLE[difficulty_idx]
         
         return {
             'difficulty_category': difficulty_category,
             'difficulty_description': difficulty_description,
-            'opportunity_rating': opportunity_rating,
-            'first_page_probability': first_page_prob,
+            'opportunity_rating': _OPPORTUNITY_TABLE[opportunity_idx],
+            'first_page_probability': keyword_data.get('first_page_probability', 0.5),
             'recommendation': self._generate_recommendation(keyword_data)
         }
     
@@ -200,23 +332,53 @@ class KeywordScorer:
         Returns:
             Sorted list of top keywords
         """
-        # Calculate opportunity scores
-        for kw_data in keywords_data:
-            kw_data['opportunity_score'] = self.calculate_opportunity_score(kw_data)
-            kw_data['ranking_potential'] = self.estimate_ranking_potential(kw_data)
-        
-        # Sort by opportunity score (descending)
-        sorted_keywords = sorted(
-            keywords_data,
-            key=lambda x: x['opportunity_score'],
-            reverse=True
+        count = len(keywords_data)
+        top_n = max(min(top_n, count), 0)
+        if top_n == 0:
+            return []
+        
+        # Score every keyword on columns; only the winners' records are touched
+        scores = self._opportunity_scores(
+            self._metric(keywords_data, 'estimated_volume'),
+            self._metric(keywords_data, 'competition_score'),
+            self._metric(keywords_data, 'relevance_score')
         )
         
-        # Add rank numbers
-        for i, kw_data in enumerate(sorted_keywords[:top_n], 1):
-            kw_data['rank'] = i
+        # Select the top N in linear time, then sort only that slice (descending).
+        # Every keyword tied with the N-th best stays a candidate, so the stable
+        # sort keeps ties in their input order
+        if top_n < count:
+            cutoff = scores[np.argpartition(-scores, top_n - 1)[top_n - 1]]
+            top = np.flatnonzero(scores >= cutoff)
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-scores[top], kind='stable')][:top_n]
+        
+        top_keywords = [keywords_data[i] for i in top.tolist()]
+        difficulties = self.calculate_keyword_difficulty_batch(top_keywords)
+        difficulty_idx = np.searchsorted(
+            _DIFF_THRESH, self._metric(top_keywords, 'competition_score'), side='right'
+        )
+        opportunity_idx = np.searchsorted(_OPPORTUNITY_THRESH, scores[top], side='right')
+        
+        for rank, (kw_data, score, difficulty, diff_i, opp_i) in enumerate(
+            zip(
+                top_keywords,
+                scores[top].tolist(),
+                difficulties.tolist(),
+                difficulty_idx.tolist(),
+                opportunity_idx.tolist()
+            ),
+            1
+        ):
+            kw_data['opportunity_score'] = score
+            kw_data['keyword_difficulty'] = difficulty
+            kw_data['ranking_potential'] = self._ranking_potential(kw_data, diff_i, opp_i)
+            
+            # Add rank numbers
+            kw_data['rank'] = rank
         
-        return sorted_keywords[:top_n]
+        return top_keywords
     
     def generate_reasoning(self, keyword_data: Dict) -> str:
         """
@@ -238,20 +400,11 @@ class KeywordScorer:
         reasons = []
         
         # Volume reasoning
-        if volume > 5000:
-            reasons.append(f"high search volume ({volume:,}/month)")
-        elif volume > 1000:
-            reasons.append(f"moderate search volume ({volume:,}/month)")
-        else:
-            reasons.append(f"low search volume ({volume:,}/month)")
+        volume_level = _VOLUME_TABLE[bisect_left(_VOLUME_THRESH, volume)]
+        reasons.append(f"{volume_level} search volume ({volume:,}/month)")
         
         # Competition reasoning
-        if competition < 30:
-            reasons.append("low competition")
-        elif competition < 50:
-            reasons.append("moderate competition")
-        else:
-            reasons.append("high competition")
+        reasons.append(_COMPETITION_TABLE[bisect_right(_COMPETITION_THRESH, competition)])
         
         # Brand dominance
         if big_brands == 0:
@@ -262,12 +415,7 @@ class KeywordScorer:
             reasons.append(f"{big_brands} major brands dominating results")
         
         # Relevance
-        if relevance >= 0.8:
-            reasons.append("highly relevant to seed keyword")
-        elif relevance >= 0.6:
-            reasons.append("moderately relevant")
-        else:
-            reasons.append("loosely related")
+        reasons.append(_RELEVANCE_TABLE[bisect_right(_RELEVANCE_THRESH, relevance)])
         
         # SERP features
         if keyword_data.get('has_featured_snippet'):
@@ -278,6 +426,94 @@ class KeywordScorer:
         return f"{keyword}: " + ", ".join(reasons)
 
 
+class TopNFilter:
+    """
+    Decide keyword by keyword which keywords still need competition data
+    
+    A keyword whose best case (competition 0) falls below the N-th best
+    worst case (competition 100) seen so far can never make the top N. That
+    threshold only rises as keywords arrive, so such keywords are dropped for
+    good. A keyword is held back only while some keyword already beats its
+    best case; every other keyword is released at once, so competition
+    analysis overlaps with volume lookups.
+    """
+    
+    def __init__(self, scorer: KeywordScorer, top_n: int = 50):
+        """
+        Start with no keywords
+        
+        Args:
+            scorer: Scorer whose weights define the opportunity bounds
+            top_n: Number of top keywords that will be returned
+        """
+        self.scorer = scorer
+        self.top_n = top_n
+        self.pruned = 0
+        self._best_lower = float('-inf')
+        self._top_lowers: List[float] = []  # min-heap of the N best lower bounds
+        self._held: List[Tuple[float, Dict]] = []
+    
+    @property
+    def threshold(self) -> float:
+        """Lower bound at least N keywords are guaranteed to reach"""
+        if self.top_n <= 0:
+            return float('inf')
+        if len(self._top_lowers) < self.top_n:
+            return float('-inf')
+        return self._top_lowers[0]
+    
+    def add(self, kw_data: Dict) -> List[Dict]:
+        """
+        Take a keyword whose volume and relevance are known
+        
+        Args:
+            kw_data: Keyword dictionary with volume and relevance
+            
+        Returns:
+            Keywords to analyze now: the new one, unless it is held or dropped
+        """
+        # Worst case at competition 100, best case at competition 0
+        volume = kw_data.get('estimated_volume', _METRIC_DEFAULTS['estimated_volume'])
+        relevance = kw_data.get('relevance_score', _METRIC_DEFAULTS['relevance_score'])
+        lower = self.scorer.calculate_opportunity_score(
+            {'estimated_volume': volume, 'competition_score': 100, 'relevance_score': relevance}
+        )
+        upper = self.scorer.calculate_opportunity_score(
+            {'estimated_volume': volume, 'competition_score': 0, 'relevance_score': relevance}
+        )
+        
+        if self.top_n > 0:
+            if len(self._top_lowers) < self.top_n:
+                heapq.heappush(self._top_lowers, lower)
+            else:
+                heapq.heappushpop(self._top_lowers, lower)
+        self._best_lower = max(self._best_lower, lower)
+        
+        # Held keywords the raised threshold rules out are dropped
+        threshold = self.threshold
+        kept = [(best, held) for best, held in self._held if best >= threshold]
+        self.pruned += len(self._held) - len(kept)
+        self._held = kept
+        
+        if upper < threshold:
+            self.pruned += 1
+            return []
+        if upper < self._best_lower:
+            self._held.append((upper, kw_data))
+            return []
+        return [kw_data]
+    
+    def drain(self) -> List[Dict]:
+        """
+        Release the held keywords that can still make the top N
+        
+        Returns:
+            Held keywords, in arrival order, once no more keywords will arrive
+        """
+        held, self._held = self._held, []
+        return [kw_data for _, kw_data in held]
+
+
 # Example usage
 if __name__ == "__main__":
     scorer = KeywordScorer()
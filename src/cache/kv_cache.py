@@ -0,0 +1,154 @@
+"""
+SQLite-backed Key-Value Cache for API Results
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils import fast_json
+
+
+class KVCache:
+    """Persistent key-value cache with optional per-entry expiry"""
+    
+    def __init__(self, path: str = None):
+        """
+        Open (or create) the cache database
+        
+        Args:
+            path: SQLite file path (optional, will use env var if not provided)
+        """
+        self.path = path or os.getenv('CACHE_PATH', '.cache/seo_agent.sqlite')
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection shared by the worker threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS kv ('
+            'id INTEGER PRIMARY KEY, '
+            'key TEXT NOT NULL, '
+            'value TEXT NOT NULL, '
+            'expires_at REAL)'
+        )
+        self._conn.commit()
+        self.purge_expired()
+    
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Build a cache key from its parts
+        
+        Args:
+            parts: Values identifying the cached entry
+            
+        Returns:
+            Hex digest key
+        """
+        raw = '|'.join(str(part) for part in parts)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _row_id(key: str) -> int:
+        """Map a key onto the signed 64-bit rowid used as primary key"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value, or None on miss or expiry
+        """
+        return self.get_many([key]).get(key)
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Look up several cached values at once
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Dictionary with the keys that were found and still fresh
+        """
+        found = {}
+        now = time.time()
+        
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    'SELECT key, value, expires_at FROM kv WHERE id = ?',
+                    (self._row_id(key),)
+                ).fetchone()
+                
+                if row is None or row[0] != key:
+                    continue
+                if row[2] is not None and row[2] < now:
+                    continue
+                
+                found[key] = fast_json.loads(row[1])
+        
+        return found
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires (None = never)
+        """
+        self.set_many({key: value}, ttl=ttl)
+    
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Store several values in one transaction
+        
+        Args:
+            items: Mapping of cache keys to JSON-serializable values
+            ttl: Seconds until the entries expire (None = never)
+        """
+        expires_at = time.time() + ttl if ttl else None
+        rows = [
+            (self._row_id(key), key, fast_json.dumps(value).decode('utf-8'), expires_at)
+            for key, value in items.items()
+        ]
+        
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO kv (id, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+    
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries; reads already skip them, this reclaims the rows
+        
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            deleted = self._conn.execute(
+                'DELETE FROM kv WHERE expires_at < ?', (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        
+        return deleted
+    
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
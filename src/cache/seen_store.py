@@ -0,0 +1,61 @@
+"""
+Persistent Index of Keywords Already Scored for a Seed
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.cache.kv_cache import KVCache
+
+
+class SeenStore:
+    """Remember fully scored keywords so overlapping runs skip steps 5-7"""
+    
+    def __init__(self, cache: KVCache, namespace: Tuple = (), ttl: Optional[float] = None):
+        """
+        Initialize the store on top of the shared cache
+        
+        Args:
+            cache: Persistent key-value cache holding the entries
+            namespace: Extra key parts that scope entries (e.g. SERP locale)
+            ttl: Seconds until an entry is re-scored (optional, will use env var if not provided)
+        """
+        self.cache = cache
+        self.namespace = tuple(namespace)
+        # Volume and competition drift, re-score after a week by default
+        self.ttl = ttl if ttl is not None else float(os.getenv('SEEN_TTL', str(7 * 24 * 3600)))
+    
+    def _key(self, seed_family: str, keyword: str) -> str:
+        """Cache key for a (seed family, keyword) pair"""
+        return KVCache.make_key('scored', seed_family, keyword, *self.namespace)
+    
+    def fetch_many(self, seed_family: str, keywords: List[str]) -> Dict[str, Dict]:
+        """
+        Look up keywords scored in earlier runs
+        
+        Args:
+            seed_family: Normalized seed keyword
+            keywords: Candidate keywords
+            
+        Returns:
+            Dictionary mapping each known keyword to its scored data
+        """
+        keys = {self._key(seed_family, kw): kw for kw in keywords}
+        found = self.cache.get_many(list(keys))
+        
+        return {keys[key]: kw_data for key, kw_data in found.items()}
+    
+    def store_many(self, seed_family: str, scored: List[Dict]):
+        """
+        Record newly scored keywords
+        
+        Args:
+            seed_family: Normalized seed keyword
+            scored: Keyword dictionaries from the scoring pipeline
+        """
+        if not scored:
+            return
+        
+        self.cache.set_many(
+            {self._key(seed_family, kw_data['keyword']): kw_data for kw_data in scored},
+            ttl=self.ttl
+        )
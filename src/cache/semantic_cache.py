@@ -0,0 +1,241 @@
+"""
+Embedding-Similarity Cache for LLM Results
+"""
+import re
+import threading
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils import fast_json
+
+
+# Tokens that flip a keyword's meaning even when the embeddings are
+# near-identical ("cpc rates" vs "cpm rates"); never share results across them
+DISTINGUISHING_TOKENS = frozenset({
+    'cpc', 'cpm', 'cpa', 'cpl', 'ctr', 'roi', 'roas', 'seo', 'sem', 'ppc',
+    'b2b', 'b2c', 'saas', 'free', 'paid', 'cheap', 'luxury', 'remote',
+    'online', 'offline', 'near', 'vs', 'not', 'without', 'no'
+})
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class SemanticCache:
+    """Reuse a cached result when a new key is a near-paraphrase of a cached one"""
+    
+    def __init__(
+        self, 
+        path: str, 
+        dimension: int, 
+        threshold: float = 0.95, 
+        max_entries: Optional[int] = None, 
+        evict_every: int = 100
+    ):
+        """
+        Load (or create) a cache stored as <path>.npy plus <path>.faiss, or
+        <path>.vectors.npy when FAISS is not installed
+        
+        Args:
+            path: File path prefix for the persisted index and entries
+            dimension: Embedding vector size
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Keep at most this many entries, dropping the least
+                recently used (None = unbounded)
+            evict_every: Check the size limit once per this many inserts
+        """
+        try:
+            import faiss
+        except ImportError:
+            faiss = None
+        
+        self._faiss = faiss
+        self._lock = threading.Lock()
+        self.dimension = dimension
+        self.path = Path(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.evict_every = max(evict_every, 1)
+        self.keys: List[str] = []
+        self.values: List[Any] = []
+        self._last_used: List[int] = []
+        self._clock = 0
+        self._inserts = 0
+        
+        # NumPy fallback: normalized vectors in a matrix grown by doubling
+        self._matrix = np.empty((0, dimension), dtype=np.float32)
+        
+        index_file = self._index_file()
+        entries_file = self.path.with_suffix('.npy')
+        
+        if index_file.exists() and entries_file.exists():
+            if faiss is not None:
+                self.index = faiss.read_index(str(index_file))
+            else:
+                self._matrix = np.load(index_file)
+            entries = np.load(entries_file)
+            self.keys = entries['key'].tolist()
+            self.values = [fast_json.loads(value) for value in entries['value'].tolist()]
+            # Reloaded entries keep their stored order as recency
+            self._last_used = list(range(len(self.keys)))
+            self._clock = len(self.keys)
+        elif faiss is not None:
+            # Inner product over L2-normalized vectors == cosine similarity
+            self.index = faiss.IndexFlatIP(dimension)
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def _index_file(self) -> Path:
+        """File holding the vectors for the active backend"""
+        if self._faiss is not None:
+            return self.path.with_suffix('.faiss')
+        return self.path.with_suffix('.vectors.npy')
+    
+    def lookup(self, key: str, vector: np.ndarray) -> Optional[Any]:
+        """
+        Find the cached value of the closest paraphrase
+        
+        Args:
+            key: Text the vector was computed from
+            vector: Its embedding
+            
+        Returns:
+            Cached value, or None when nothing is similar enough
+        """
+        return self.lookup_many([key], vector.reshape(1, -1))[0]
+    
+    def lookup_many(self, keys: List[str], vectors: np.ndarray) -> List[Optional[Any]]:
+        """
+        Find the cached values of the closest paraphrases in one search
+        
+        Args:
+            keys: Texts the vectors were computed from
+            vectors: Their embeddings, one row per key
+            
+        Returns:
+            Cached value per key, or None where nothing is similar enough
+        """
+        with self._lock:
+            if not self.keys or not keys:
+                return [None] * len(keys)
+            
+            similarities, ids = self._search(self._normalized(vectors))
+            
+            found = []
+            for key, similarity, idx in zip(keys, similarities.tolist(), ids.tolist()):
+                if idx < 0 or similarity < self.threshold or not self._same_entities(key, self.keys[idx]):
+                    found.append(None)
+                    continue
+                
+                self._clock += 1
+                self._last_used[idx] = self._clock
+                found.append(self.values[idx])
+            
+            return found
+    
+    def add(self, keys: List[str], vectors: np.ndarray, values: List[Any]):
+        """
+        Insert new entries
+        
+        Args:
+            keys: Texts the vectors were computed from
+            vectors: Their embeddings, one row per key
+            values: JSON-serializable values to return on a hit
+        """
+        if not keys:
+            return
+        
+        with self._lock:
+            self._append(self._normalized(vectors))
+            self.keys.extend(keys)
+            self.values.extend(values)
+            self._last_used.extend(range(self._clock + 1, self._clock + 1 + len(keys)))
+            self._clock += len(keys)
+            
+            # Amortize eviction: only check the size limit every evict_every inserts
+            self._inserts += len(keys)
+            if self._inserts >= self.evict_every:
+                self._inserts = 0
+                self._evict()
+    
+    @staticmethod
+    def _normalized(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows so the inner product equals cosine similarity"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+    
+    def _search(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best similarity and entry id per query row (lock held)"""
+        if self._faiss is not None:
+            similarities, ids = self.index.search(vectors, 1)
+            return similarities[:, 0], ids[:, 0]
+        
+        # One matrix product scores every query against every entry
+        scores = vectors @ self._matrix[:len(self.keys)].T
+        ids = scores.argmax(axis=1)
+        return scores[np.arange(len(ids)), ids], ids
+    
+    def _append(self, vectors: np.ndarray):
+        """Add normalized vectors after the existing entries (lock held)"""
+        if self._faiss is not None:
+            self.index.add(vectors)
+            return
+        
+        size = len(self.keys)
+        needed = size + len(vectors)
+        if needed > len(self._matrix):
+            grown = np.empty((max(needed, 2 * len(self._matrix), 64), self.dimension), dtype=np.float32)
+            grown[:size] = self._matrix[:size]
+            self._matrix = grown
+        self._matrix[size:needed] = vectors
+    
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries (lock held)"""
+        if self.max_entries is None or len(self.keys) <= self.max_entries:
+            return
+        
+        excess = len(self.keys) - self.max_entries
+        stale = np.argsort(np.asarray(self._last_used), kind='stable')[:excess]
+        
+        drop = set(stale.tolist())
+        keep = [i for i in range(len(self.keys)) if i not in drop]
+        
+        # IndexFlat compacts on removal, keeping the survivors' relative order
+        if self._faiss is not None:
+            self.index.remove_ids(stale.astype(np.int64))
+        else:
+            self._matrix = self._matrix[keep]
+        self.keys = [self.keys[i] for i in keep]
+        self.values = [self.values[i] for i in keep]
+        self._last_used = [self._last_used[i] for i in keep]
+    
+    def save(self):
+        """Persist the index and its entries"""
+        with self._lock:
+            self._evict()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._faiss is not None:
+                self._faiss.write_index(self.index, str(self._index_file()))
+            else:
+                np.save(self._index_file(), self._matrix[:len(self.keys)])
+            
+            values = [fast_json.dumps(value).decode('utf-8') for value in self.values]
+            key_width = max((len(key) for key in self.keys), default=1)
+            value_width = max((len(value) for value in values), default=1)
+            entries = np.array(
+                list(zip(self.keys, values)),
+                dtype=[('key', f'U{key_width}'), ('value', f'U{value_width}')]
+            )
+            np.save(self.path.with_suffix('.npy'), entries)
+    
+    @staticmethod
+    def _same_entities(a: str, b: str) -> bool:
+        """True unless the texts differ on a distinguishing token or a number"""
+        differing = set(_TOKEN_PATTERN.findall(a.lower())) ^ set(_TOKEN_PATTERN.findall(b.lower()))
+        return not any(
+            token in DISTINGUISHING_TOKENS or any(ch.isdigit() for ch in token)
+            for token in differing
+        )
@@ -0,0 +1,83 @@
+"""
+Local Sentence Embedding Client for Semantic Similarity
+"""
+import os
+import threading
+from importlib.util import find_spec
+from typing import List
+
+import numpy as np
+
+
+class EmbeddingClient:
+    """Client for a local sentence-transformers embedding model"""
+    
+    def __init__(self, model_name: str = None):
+        """
+        Initialize the embedding client; the model itself loads on first use
+        
+        Args:
+            model_name: sentence-transformers model (optional, will use env var if not provided)
+        """
+        self.model_name = model_name or os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self.enabled = os.getenv('EMBEDDINGS_ENABLED', 'true').lower() == 'true'
+        self._model = None
+        self._lock = threading.Lock()
+        
+        if self.enabled and find_spec('sentence_transformers') is None:
+            print("Warning: Could not load embedding model: sentence-transformers is not installed")
+            self.enabled = False
+    
+    @property
+    def model(self):
+        """The sentence-transformers model, loaded on first access"""
+        with self._lock:
+            if self._model is None:
+                if not self.enabled:
+                    raise RuntimeError("Embedding model is unavailable")
+                
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    print(f"Warning: Could not load embedding model: {str(e)}")
+                    self.enabled = False
+                    raise RuntimeError(f"Embedding model is unavailable: {str(e)}") from e
+            
+            return self._model
+    
+    def available(self) -> bool:
+        """
+        Load the model if needed and report whether it can be used
+        
+        Returns:
+            True when the model loaded
+        """
+        try:
+            self.model
+            return True
+        except RuntimeError:
+            return False
+    
+    @property
+    def dimension(self) -> int:
+        """Size of the embedding vectors"""
+        return self.model.get_sentence_embedding_dimension()
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as L2-normalized vectors
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Float32 array of shape (len(texts), dimension); inner product equals cosine
+        """
+        vectors = self.model.encode(
+            list(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
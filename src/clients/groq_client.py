@@ -2,30 +2,125 @@
 Groq LLM Client for Keyword Generation and Analysis
 """
 import os
+import re
 import json
-from typing import List, Dict
-from groq import Groq
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Dict, Optional, Tuple
+import numpy as np
+from groq import Groq, AsyncGroq
+from aiolimiter import AsyncLimiter
 import time
 
+from src.cache.kv_cache import KVCache
+from src.cache.semantic_cache import SemanticCache
+from src.clients.embedding_client import EmbeddingClient
+from src.utils import backoff, fast_json
+
+
+# Leading list marker on a plain-text keyword line ("- ", "* ", "• ", "12. ")
+_LIST_MARKER = re.compile(r'^(?:[-*•]\s+|\d+\.\s+)')
+
+
+def _strip_fences(content: str) -> str:
+    """
+    Remove a markdown code fence around an LLM response
+    
+    Args:
+        content: Stripped response text
+        
+    Returns:
+        Text inside the first fenced block, or the content unchanged if it
+        does not start with a fence
+    """
+    if not content.startswith('```'):
+        return content
+    
+    # Drop the opening fence and its language tag, then anything from the closing fence on
+    content = content[3:].removeprefix('json')
+    return content.partition('```')[0]
+
 
 class GroqClient:
     """Client for interacting with Groq LLM API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self, 
+        api_key: str = None, 
+        cache: Optional[KVCache] = None, 
+        embedder: Optional[EmbeddingClient] = None, 
+        use_llm: Optional[bool] = None
+    ):
         """
         Initialize Groq client
         
         Args:
             api_key: Groq API key (optional, will use env var if not provided)
+            cache: Persistent cache for relevance scores (optional)
+            embedder: Embedding model for relevance scoring and, with a cache,
+                the paraphrase caches (optional)
+            use_llm: Score relevance with the LLM instead of embedding similarity
+                (optional, will use env var if not provided)
         """
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         if not self.api_key:
             raise ValueError("Groq API key not found. Set GROQ_API_KEY environment variable.")
         
         self.client = Groq(api_key=self.api_key)
+        self.aclient = AsyncGroq(api_key=self.api_key)
         self.model = "llama-3.3-70b-versatile"
         self.max_retries = 3
         self.retry_delay = 1
+        self.cache = cache
+        
+        # Identical prompts are answered from the cache; expire after a week by default
+        self.prompt_cache_ttl = float(os.getenv('PROMPT_CACHE_TTL', str(7 * 24 * 3600)))
+        
+        # Relevance scores the model returned; expire after a month by default
+        self.relevance_cache_ttl = float(os.getenv('RELEVANCE_CACHE_TTL', str(30 * 24 * 3600)))
+        
+        # Token bucket honoring Groq's requests-per-minute quota
+        self.rpm = int(os.getenv('GROQ_RPM', '30'))
+        self.limiter = AsyncLimiter(self.rpm, 60)
+        
+        # Cap on requests in flight for fan-out helpers such as generate_many_async
+        self.max_concurrency = int(os.getenv('GROQ_MAX_CONCURRENCY', '4'))
+        
+        # Paraphrase caches: reuse results for near-identical seeds and candidates
+        self.embedder = embedder if embedder is not None and embedder.enabled else None
+        self.semantic_threshold = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+        self.semantic_cache_dir = os.getenv('SEMANTIC_CACHE_DIR', '.cache/semantic')
+        self.semantic_max_entries = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '10000'))
+        self._semantic_caches: Dict[str, Optional[SemanticCache]] = {}
+        self._semantic_lock = threading.Lock()
+        
+        # Relevance defaults to local embedding similarity; the LLM is the fallback
+        if use_llm is None:
+            use_llm = os.getenv('RELEVANCE_USE_LLM', 'false').lower() == 'true'
+        if not use_llm and self.embedder is None:
+            print("⚠️  Embeddings unavailable, scoring relevance with the LLM")
+            use_llm = True
+        self._use_llm = use_llm
+        
+        # Cosine similarities between related phrases bunch up in the middle of
+        # the range; this band is stretched onto the LLM's 0-1 relevance scale
+        self.similarity_floor = float(os.getenv('EMBEDDING_SIMILARITY_FLOOR', '0.2'))
+        self.similarity_ceiling = float(os.getenv('EMBEDDING_SIMILARITY_CEILING', '0.8'))
+    
+    @property
+    def use_llm(self) -> bool:
+        """Score relevance with the LLM (requested, or the embedding model failed to load)"""
+        if not self._use_llm and not self.embedder.available():
+            print("⚠️  Embeddings unavailable, scoring relevance with the LLM")
+            self._use_llm = True
+        return self._use_llm
+    
+    async def _use_llm_async(self) -> bool:
+        """use_llm, loading the embedding model on a worker thread instead of the event loop"""
+        if not self._use_llm:
+            await asyncio.to_thread(self.embedder.available)
+        return self.use_llm
     
     def generate_keyword_variations(
         self, 
@@ -42,6 +137,104 @@ class GroqClient:
         Returns:
             List of keyword variations
         """
+        cached, vector = self._cached_variations(seed_keyword)
+        if cached is not None:
+            return cached[:count]
+        
+        for attempt in range(self.max_retries):
+            try:
+                keywords = self._complete(
+                    self._variations_messages(seed_keyword, count),
+                    temperature=0.7,
+                    max_tokens=2000,
+                    parse=lambda content: self._parse_variations(content, count),
+                    stop_at_json=True
+                )
+                if keywords is not None:
+                    self._store_variations(seed_keyword, vector, keywords)
+                    return keywords
+            
+            except Exception as e:
+                print(f"Attempt {attempt + 1} failed: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(backoff.delay(attempt, self.retry_delay, backoff.retry_after(e)))
+                else:
+                    raise
+        
+        return []
+    
+    async def generate_keyword_variations_async(
+        self, 
+        seed_keyword: str, 
+        count: int = 30
+    ) -> List[str]:
+        """
+        Generate keyword variations without blocking the event loop
+        
+        Args:
+            seed_keyword: The seed keyword to expand from
+            count: Number of variations to generate
+            
+        Returns:
+            List of keyword variations
+        """
+        # Embedding the seed is CPU-bound, keep it off the event loop
+        cached, vector = await asyncio.to_thread(self._cached_variations, seed_keyword)
+        if cached is not None:
+            return cached[:count]
+        
+        for attempt in range(self.max_retries):
+            try:
+                keywords = await self._complete_async(
+                    self._variations_messages(seed_keyword, count),
+                    temperature=0.7,
+                    max_tokens=2000,
+                    parse=lambda content: self._parse_variations(content, count),
+                    stop_at_json=True
+                )
+                if keywords is not None:
+                    self._store_variations(seed_keyword, vector, keywords)
+                    return keywords
+            
+            except Exception as e:
+                print(f"Attempt {attempt + 1} failed: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(backoff.delay(attempt, self.retry_delay, backoff.retry_after(e)))
+                else:
+                    raise
+        
+        return []
+    
+    async def generate_many_async(
+        self, 
+        seed_keywords: List[str], 
+        count: int = 30
+    ) -> Dict[str, List[str]]:
+        """
+        Generate keyword variations for several seeds concurrently
+        
+        Args:
+            seed_keywords: Seed keywords to expand
+            count: Number of variations per seed
+            
+        Returns:
+            Dictionary mapping each seed to its variations (empty on failure)
+        """
+        semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+        
+        async def generate(seed_keyword: str) -> List[str]:
+            async with semaphore:
+                try:
+                    return await self.generate_keyword_variations_async(seed_keyword, count)
+                except Exception as e:
+                    print(f"Error generating variations for '{seed_keyword}': {str(e)}")
+                    return []
+        
+        variations = await asyncio.gather(*(generate(seed) for seed in seed_keywords))
+        return dict(zip(seed_keywords, variations))
+    
+    def _variations_messages(self, seed_keyword: str, count: int) -> List[Dict]:
+        """Chat messages for a keyword variations request"""
         prompt = f"""You are an SEO expert. Generate {count} keyword variations for the seed keyword: "{seed_keyword}"
 
 Requirements:
@@ -58,68 +251,53 @@ Example format:
 
 Generate the keywords now:"""
 
-        for attempt in range(self.max_retries):
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an SEO expert specializing in keyword research. Return only valid JSON."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    temperature=0.7,
-                    max_tokens=2000
-                )
-                
-                # Extract content
-                content = response.choices[0].message.content.strip()
-                
-                # Try to parse as JSON
-                try:
-                    # Remove markdown code blocks if present
-                    if content.startswith('```'):
-                        content = content.split('```')[1]
-                        if content.startswith('json'):
-                            content = content[4:]
-                    
-                    keywords = json.loads(content)
-                    
-                    # Validate it's a list
-                    if isinstance(keywords, list):
-                        # Clean and filter keywords
-                        cleaned = []
-                        for kw in keywords:
-                            if isinstance(kw, str) and kw.strip():
-                                cleaned.append(kw.strip().lower())
-                        
-                        # Remove duplicates while preserving order
-                        seen = set()
-                        unique_keywords = []
-                        for kw in cleaned:
-                            if kw not in seen:
-                                seen.add(kw)
-                                unique_keywords.append(kw)
-                        
-                        return unique_keywords[:count]
-                    
-                except json.JSONDecodeError:
-                    # Fallback: extract keywords from text
-                    keywords = self._extract_keywords_from_text(content)
-                    return keywords[:count]
-                
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    raise
+        return [
+            {
+                "role": "system",
+                "content": "You are an SEO expert specializing in keyword research. Return only valid JSON."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _parse_variations(self, content: str, count: int) -> Optional[List[str]]:
+        """
+        Parse a keyword variations response
         
-        return []
+        Args:
+            content: Raw LLM response text
+            count: Maximum number of keywords to return
+            
+        Returns:
+            Cleaned, deduplicated keywords, or None if the JSON was not a list
+        """
+        content = content.strip()
+        
+        # Try to parse as JSON
+        try:
+            # Remove markdown code blocks if present
+            content = _strip_fences(content)
+            keywords = fast_json.loads(content)
+        
+        except json.JSONDecodeError:
+            # Fallback: extract keywords from text
+            keywords = self._extract_keywords_from_text(content)
+            return keywords[:count]
+        
+        # Validate it's a list
+        if not isinstance(keywords, list):
+            return None
+        
+        # Clean and filter keywords
+        cleaned = []
+        for kw in keywords:
+            if isinstance(kw, str) and kw.strip():
+                cleaned.append(kw.strip().lower())
+        
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(cleaned))[:count]
     
     def _extract_keywords_from_text(self, text: str) -> List[str]:
         """
@@ -135,20 +313,15 @@ Generate the keywords now:"""
         lines = text.split('\n')
         
         for line in lines:
-            # Remove common list markers
-            line = line.strip()
-            for marker in ['- ', '* ', '• ', '1. ', '2. ', '3. ']:
-                if line.startswith(marker):
-                    line = line[len(marker):]
-            
-            # Remove quotes
-            line = line.strip('"\'')
+            # Remove common list markers, then quotes
+            line = _LIST_MARKER.sub('', line.strip(), count=1).strip('"\'')
             
             # Skip empty lines or lines that are too short
             if line and len(line) > 3:
                 keywords.append(line.lower())
         
-        return keywords
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(keywords))
     
     def calculate_relevance_score(
         self, 
@@ -165,6 +338,100 @@ Generate the keywords now:"""
         Returns:
             Relevance score between 0.0 and 1.0
         """
+        if not self.use_llm:
+            return self._embedding_relevance(seed_keyword, [candidate_keyword])[candidate_keyword]
+        
+        try:
+            score = self._llm_relevance(seed_keyword, candidate_keyword)
+        except Exception as e:
+            print(f"Error calculating relevance: {str(e)}")
+            return 0.5
+        
+        # Default to moderate relevance if parsing fails
+        return 0.6 if score is None else score
+    
+    async def calculate_relevance_score_async(
+        self, 
+        seed_keyword: str, 
+        candidate_keyword: str
+    ) -> float:
+        """
+        Calculate semantic relevance without blocking the event loop
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keyword: Keyword to evaluate
+            
+        Returns:
+            Relevance score between 0.0 and 1.0
+        """
+        if not await self._use_llm_async():
+            scores = await asyncio.to_thread(self._embedding_relevance, seed_keyword, [candidate_keyword])
+            return scores[candidate_keyword]
+        
+        try:
+            score = await self._llm_relevance_async(seed_keyword, candidate_keyword)
+        except Exception as e:
+            print(f"Error calculating relevance: {str(e)}")
+            return 0.5
+        
+        # Default to moderate relevance if parsing fails
+        return 0.6 if score is None else score
+    
+    def _llm_relevance(self, seed_keyword: str, candidate_keyword: str) -> Optional[float]:
+        """
+        Rate one keyword with the LLM, reusing near-paraphrase scores
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keyword: Keyword to evaluate
+            
+        Returns:
+            Relevance score, or None when the response held no rating
+        """
+        similar, vectors = self._similar_relevance(seed_keyword, [candidate_keyword])
+        if candidate_keyword in similar:
+            return similar[candidate_keyword]
+        
+        score = self._complete(
+            self._relevance_messages(seed_keyword, candidate_keyword),
+            temperature=0.3,
+            max_tokens=10,
+            parse=self._parse_relevance_score
+        )
+        if score is not None:
+            self._remember_relevance(seed_keyword, {candidate_keyword: score}, vectors)
+        return score
+    
+    async def _llm_relevance_async(self, seed_keyword: str, candidate_keyword: str) -> Optional[float]:
+        """
+        Rate one keyword with the LLM without blocking the event loop (see _llm_relevance)
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keyword: Keyword to evaluate
+            
+        Returns:
+            Relevance score, or None when the response held no rating
+        """
+        similar, vectors = await asyncio.to_thread(
+            self._similar_relevance, seed_keyword, [candidate_keyword]
+        )
+        if candidate_keyword in similar:
+            return similar[candidate_keyword]
+        
+        score = await self._complete_async(
+            self._relevance_messages(seed_keyword, candidate_keyword),
+            temperature=0.3,
+            max_tokens=10,
+            parse=self._parse_relevance_score
+        )
+        if score is not None:
+            self._remember_relevance(seed_keyword, {candidate_keyword: score}, vectors)
+        return score
+    
+    def _relevance_messages(self, seed_keyword: str, candidate_keyword: str) -> List[Dict]:
+        """Chat messages for a single relevance request"""
         prompt = f"""Rate the semantic relevance between these two keywords on a scale of 0.0 to 1.0:
 
 Seed keyword: "{seed_keyword}"
@@ -180,38 +447,30 @@ Examples: 0.95, 0.72, 0.43
 
 Your rating:"""
 
+        return [
+            {
+                "role": "system",
+                "content": "You are a semantic analysis expert. Return only a decimal number."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _parse_relevance_score(self, content: str) -> Optional[float]:
+        """Parse a single relevance response into a clamped score (None if unparseable)"""
+        # Extract score
+        content = content.strip()
+        
+        # Parse the score
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a semantic analysis expert. Return only a decimal number."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=10
-            )
-            
-            # Extract score
-            content = response.choices[0].message.content.strip()
-            
-            # Parse the score
-            try:
-                score = float(content)
-                # Clamp between 0 and 1
-                return max(0.0, min(1.0, score))
-            except ValueError:
-                # Default to moderate relevance if parsing fails
-                return 0.6
-                
-        except Exception as e:
-            print(f"Error calculating relevance: {str(e)}")
-            return 0.5
+            score = float(content)
+            # Clamp between 0 and 1
+            return max(0.0, min(1.0, score))
+        except ValueError:
+            # Unparseable responses stay out of the prompt cache
+            return None
     
     def batch_calculate_relevance(
         self, 
@@ -221,6 +480,126 @@ Your rating:"""
         """
         Calculate relevance scores for multiple keywords at once
         
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keywords: List of keywords to evaluate
+            
+        Returns:
+            Dictionary mapping keywords to relevance scores; with the LLM,
+            keywords it could not rate are left out
+        """
+        if not self.use_llm:
+            return self._embedding_relevance(seed_keyword, candidate_keywords)
+        
+        # Only keywords missing from the caches go to the API
+        cached, misses, vectors = self._cached_relevance(seed_keyword, candidate_keywords)
+        if not misses:
+            return cached
+        
+        prompt = self._batch_relevance_prompt(seed_keyword, misses)
+        
+        try:
+            scores = self._complete(
+                self._batch_relevance_messages(prompt),
+                temperature=0.3,
+                max_tokens=1000,
+                parse=lambda content: self._parse_relevance_scores(content, misses)
+            ) or {}
+            self._store_relevance(seed_keyword, scores, vectors)
+        
+        except Exception as e:
+            print(f"Batch relevance calculation failed: {str(e)}")
+            # Fallback to individual calculations; failures stay unscored
+            scores = {}
+            for kw in misses:
+                try:
+                    score = self._llm_relevance(seed_keyword, kw)
+                except Exception as error:
+                    print(f"Error calculating relevance: {str(error)}")
+                    continue
+                if score is not None:
+                    scores[kw] = score
+        
+        return self._merge_relevance(candidate_keywords, cached, scores)
+    
+    async def batch_calculate_relevance_async(
+        self, 
+        seed_keyword: str, 
+        candidate_keywords: List[str]
+    ) -> Dict[str, float]:
+        """
+        Calculate relevance scores for multiple keywords without blocking the event loop
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keywords: List of keywords to evaluate
+            
+        Returns:
+            Dictionary mapping keywords to relevance scores; with the LLM,
+            keywords it could not rate are left out
+        """
+        if not await self._use_llm_async():
+            return await asyncio.to_thread(self._embedding_relevance, seed_keyword, candidate_keywords)
+        
+        # Only keywords missing from the caches go to the API; embedding the
+        # candidates is CPU-bound, keep it off the event loop
+        cached, misses, vectors = await asyncio.to_thread(
+            self._cached_relevance, seed_keyword, candidate_keywords
+        )
+        if not misses:
+            return cached
+        
+        prompt = self._batch_relevance_prompt(seed_keyword, misses)
+        
+        try:
+            scores = await self._complete_async(
+                self._batch_relevance_messages(prompt),
+                temperature=0.3,
+                max_tokens=1000,
+                parse=lambda content: self._parse_relevance_scores(content, misses)
+            ) or {}
+            self._store_relevance(seed_keyword, scores, vectors)
+        
+        except Exception as e:
+            print(f"Batch relevance calculation failed: {str(e)}")
+            # Fallback to individual calculations, issued concurrently; failures stay unscored
+            individual = await asyncio.gather(
+                *(self._llm_relevance_async(seed_keyword, kw) for kw in misses),
+                return_exceptions=True
+            )
+            scores = {}
+            for kw, score in zip(misses, individual):
+                if isinstance(score, Exception):
+                    print(f"Error calculating relevance: {str(score)}")
+                elif score is not None:
+                    scores[kw] = score
+        
+        return self._merge_relevance(candidate_keywords, cached, scores)
+    
+    @staticmethod
+    def _merge_relevance(
+        candidate_keywords: List[str], 
+        cached: Dict[str, float], 
+        scores: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Cached and fresh scores in candidate order, leaving out unscored keywords"""
+        merged = {}
+        for kw in candidate_keywords:
+            if kw in cached:
+                merged[kw] = cached[kw]
+            elif kw in scores:
+                merged[kw] = scores[kw]
+        
+        return merged
+    
+    def _embedding_relevance(self, seed_keyword: str, candidate_keywords: List[str]) -> Dict[str, float]:
+        """
+        Score candidates by cosine similarity to the seed
+        
+        Similarities are mapped linearly from [similarity_floor,
+        similarity_ceiling] onto 0-1, so they share a scale (and the
+        MIN_RELEVANCE_SCORE threshold) with LLM ratings.
+        
         Args:
             seed_keyword: Original seed keyword
             candidate_keywords: List of keywords to evaluate
@@ -228,10 +607,344 @@ Your rating:"""
         Returns:
             Dictionary mapping keywords to relevance scores
         """
-        # Batch prompt for efficiency
+        if not candidate_keywords:
+            return {}
+        
+        # Vectors are L2-normalized, so one matrix-vector product gives every cosine
+        vectors = self.embedder.encode([seed_keyword] + list(candidate_keywords))
+        similarity = vectors[1:] @ vectors[0]
+        span = max(self.similarity_ceiling - self.similarity_floor, 1e-6)
+        scores = np.clip((similarity - self.similarity_floor) / span, 0.0, 1.0)
+        
+        return dict(zip(candidate_keywords, scores.tolist()))
+    
+    def _complete(
+        self, 
+        messages: List[Dict], 
+        temperature: float, 
+        max_tokens: int, 
+        parse: Callable[[str], Any], 
+        stop_at_json: bool = False
+    ) -> Any:
+        """
+        Run a chat completion, answering identical prompts from the cache
+        
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            parse: Turns the response text into a result; raising or returning
+                None keeps the response out of the cache
+            stop_at_json: Stream the response and stop reading as soon as it
+                holds a complete JSON value
+                
+        Returns:
+            Parsed result
+        """
+        key = self._prompt_cache_key(messages, temperature, max_tokens)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return parse(cached)
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stop_at_json
+        )
+        
+        if not stop_at_json:
+            return self._parse_and_store(key, response.choices[0].message.content, parse)
+        
+        parts = []
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                if self._ends_json(delta, parts):
+                    break
+        finally:
+            response.close()
+        
+        return self._parse_and_store(key, ''.join(parts), parse)
+    
+    async def _complete_async(
+        self, 
+        messages: List[Dict], 
+        temperature: float, 
+        max_tokens: int, 
+        parse: Callable[[str], Any], 
+        stop_at_json: bool = False
+    ) -> Any:
+        """
+        Run a chat completion without blocking the event loop (see _complete)
+        
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            parse: Turns the response text into a result
+            stop_at_json: Stream the response and stop at the first complete JSON value
+            
+        Returns:
+            Parsed result
+        """
+        key = self._prompt_cache_key(messages, temperature, max_tokens)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return parse(cached)
+        
+        # Cache hits never spend the rate limit budget
+        async with self.limiter:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=stop_at_json
+            )
+        
+        if not stop_at_json:
+            return self._parse_and_store(key, response.choices[0].message.content, parse)
+        
+        parts = []
+        try:
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                if self._ends_json(delta, parts):
+                    break
+        finally:
+            await response.close()
+        
+        return self._parse_and_store(key, ''.join(parts), parse)
+    
+    def _ends_json(self, delta: str, parts: List[str]) -> bool:
+        """
+        Check whether a streamed response now holds a complete JSON value
+        
+        Args:
+            delta: Text of the latest chunk
+            parts: Every chunk received so far, including delta
+            
+        Returns:
+            True once the first JSON array or object in the text decodes
+        """
+        # A value can only have just closed if this chunk closes a bracket
+        if ']' not in delta and '}' not in delta:
+            return False
+        
+        text = ''.join(parts)
+        starts = [i for i in (text.find('['), text.find('{')) if i >= 0]
+        if not starts:
+            return False
+        
+        try:
+            json.JSONDecoder().raw_decode(text, min(starts))
+            return True
+        except json.JSONDecodeError:
+            return False
+    
+    def _parse_and_store(self, key: str, content: str, parse: Callable[[str], Any]) -> Any:
+        """Parse a fresh completion and cache its text if it parsed"""
+        result = parse(content)
+        if result is not None and self.cache is not None:
+            self.cache.set(key, content, ttl=self.prompt_cache_ttl)
+        
+        return result
+    
+    def _prompt_cache_key(self, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        """Cache key for an exact prompt under the current model and sampling settings"""
+        return KVCache.make_key(
+            'completion',
+            self.model,
+            temperature,
+            max_tokens,
+            json.dumps(messages, sort_keys=True)
+        )
+    
+    def _relevance_cache_key(self, seed_keyword: str, keyword: str) -> str:
+        """Cache key for a (seed, keyword) relevance score under the current model"""
+        return KVCache.make_key('relevance', self.model, seed_keyword, keyword)
+    
+    def _cached_relevance(
+        self, 
+        seed_keyword: str, 
+        candidate_keywords: List[str]
+    ) -> Tuple[Dict[str, float], List[str], Dict[str, np.ndarray]]:
+        """
+        Split candidates into cached scores and keywords still to be scored
+        
+        Exact (seed, keyword) matches come from the key-value cache, then
+        near-paraphrases of keywords scored for the same seed from the
+        semantic cache.
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keywords: List of keywords to evaluate
+            
+        Returns:
+            Tuple of (cached scores, uncached keywords, embeddings of the uncached keywords)
+        """
+        cached = {}
+        if self.cache is not None:
+            keys = {kw: self._relevance_cache_key(seed_keyword, kw) for kw in candidate_keywords}
+            found = self.cache.get_many(list(keys.values()))
+            cached = {kw: found[key] for kw, key in keys.items() if key in found}
+        
+        misses = [kw for kw in candidate_keywords if kw not in cached]
+        similar, vectors = self._similar_relevance(seed_keyword, misses)
+        cached.update(similar)
+        misses = [kw for kw in misses if kw not in similar]
+        
+        return cached, misses, vectors
+    
+    def _store_relevance(
+        self, 
+        seed_keyword: str, 
+        scores: Dict[str, float], 
+        vectors: Dict[str, np.ndarray]
+    ):
+        """Persist relevance scores the model returned"""
+        if self.cache is not None:
+            self.cache.set_many(
+                {
+                    self._relevance_cache_key(seed_keyword, kw): score
+                    for kw, score in scores.items()
+                },
+                ttl=self.relevance_cache_ttl
+            )
+        
+        self._remember_relevance(seed_keyword, scores, vectors)
+    
+    def _semantic_cache(self, name: str) -> Optional[SemanticCache]:
+        """
+        Open a named semantic cache once, if embeddings are available
+        
+        Args:
+            name: File name prefix inside the semantic cache directory
+            
+        Returns:
+            The cache, or None when embeddings, the cache or FAISS are unavailable
+        """
+        if self.embedder is None or self.cache is None:
+            return None
+        
+        with self._semantic_lock:
+            if name not in self._semantic_caches:
+                try:
+                    self._semantic_caches[name] = SemanticCache(
+                        str(Path(self.semantic_cache_dir) / name),
+                        self.embedder.dimension,
+                        self.semantic_threshold,
+                        max_entries=self.semantic_max_entries
+                    )
+                except Exception as e:
+                    print(f"Warning: Semantic cache unavailable: {str(e)}")
+                    self._semantic_caches[name] = None
+            
+            return self._semantic_caches[name]
+    
+    def _relevance_semantic_cache(self, seed_keyword: str) -> Optional[SemanticCache]:
+        """Semantic cache of candidate scores for one seed"""
+        seed_id = KVCache.make_key(seed_keyword.lower())
+        return self._semantic_cache(f"relevance_semcache_{seed_id}")
+    
+    def _similar_relevance(
+        self, 
+        seed_keyword: str, 
+        candidate_keywords: List[str]
+    ) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
+        """
+        Reuse scores of near-paraphrases scored for the same seed
+        
+        Args:
+            seed_keyword: Original seed keyword
+            candidate_keywords: Keywords without an exact cached score
+            
+        Returns:
+            Tuple of (reused scores, embeddings of the keywords that missed)
+        """
+        semantic_cache = self._relevance_semantic_cache(seed_keyword)
+        if semantic_cache is None or not candidate_keywords:
+            return {}, {}
+        
+        similar, vectors = {}, {}
+        embeddings = self.embedder.encode(candidate_keywords)
+        scores = semantic_cache.lookup_many(candidate_keywords, embeddings)
+        for kw, vector, score in zip(candidate_keywords, embeddings, scores):
+            if score is not None:
+                similar[kw] = score
+            else:
+                vectors[kw] = vector
+        
+        return similar, vectors
+    
+    def _remember_relevance(
+        self, 
+        seed_keyword: str, 
+        scores: Dict[str, float], 
+        vectors: Dict[str, np.ndarray]
+    ):
+        """Add freshly scored keywords to the seed's semantic cache"""
+        semantic_cache = self._relevance_semantic_cache(seed_keyword)
+        fresh = [kw for kw in scores if kw in vectors]
+        if semantic_cache is None or not fresh:
+            return
+        
+        semantic_cache.add(fresh, np.stack([vectors[kw] for kw in fresh]), [scores[kw] for kw in fresh])
+    
+    def _cached_variations(self, seed_keyword: str) -> Tuple[Optional[List[str]], Optional[np.ndarray]]:
+        """
+        Look up variations generated for a near-paraphrase of the seed
+        
+        Args:
+            seed_keyword: The seed keyword to expand from
+            
+        Returns:
+            Tuple of (cached variations or None, seed embedding for storing a miss)
+        """
+        semantic_cache = self._semantic_cache('variations_semcache')
+        if semantic_cache is None:
+            return None, None
+        
+        vector = self.embedder.encode([seed_keyword])[0]
+        return semantic_cache.lookup(seed_keyword, vector), vector
+    
+    def _store_variations(
+        self, 
+        seed_keyword: str, 
+        vector: Optional[np.ndarray], 
+        keywords: List[str]
+    ):
+        """Add freshly generated variations to the semantic cache"""
+        semantic_cache = self._semantic_cache('variations_semcache')
+        if semantic_cache is None or vector is None or not keywords:
+            return
+        
+        semantic_cache.add([seed_keyword], vector.reshape(1, -1), [keywords])
+    
+    def save_semantic_caches(self):
+        """Persist every semantic cache opened so far"""
+        with self._semantic_lock:
+            caches = [cache for cache in self._semantic_caches.values() if cache is not None]
+        
+        for semantic_cache in caches:
+            try:
+                semantic_cache.save()
+            except Exception as e:
+                print(f"Warning: Could not save semantic cache: {str(e)}")
+    
+    def _batch_relevance_prompt(self, seed_keyword: str, candidate_keywords: List[str]) -> str:
+        """Build the batch relevance prompt"""
         keywords_str = "\n".join([f"{i+1}. {kw}" for i, kw in enumerate(candidate_keywords)])
         
-        prompt = f"""Rate the semantic relevance of each keyword to the seed keyword.
+        return f"""Rate the semantic relevance of each keyword to the seed keyword.
 Return scores as a JSON object where each keyword maps to a score (0.0 to 1.0).
 
 Seed keyword: "{seed_keyword}"
@@ -248,48 +961,47 @@ Return format:
 
 Your ratings:"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a semantic analysis expert. Return only valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Parse JSON
-            if content.startswith('```'):
-                content = content.split('```')[1]
-                if content.startswith('json'):
-                    content = content[4:]
-            
-            scores = json.loads(content)
-            
-            # Normalize and validate scores
-            normalized_scores = {}
-            for kw in candidate_keywords:
-                score = scores.get(kw, 0.5)
-                normalized_scores[kw] = max(0.0, min(1.0, float(score)))
-            
-            return normalized_scores
-            
-        except Exception as e:
-            print(f"Batch relevance calculation failed: {str(e)}")
-            # Fallback to individual calculations
-            return {
-                kw: self.calculate_relevance_score(seed_keyword, kw)
-                for kw in candidate_keywords
+    def _batch_relevance_messages(self, prompt: str) -> List[Dict]:
+        """Chat messages for a batch relevance request"""
+        return [
+            {
+                "role": "system",
+                "content": "You are a semantic analysis expert. Return only valid JSON."
+            },
+            {
+                "role": "user",
+                "content": prompt
             }
+        ]
+    
+    def _parse_relevance_scores(self, content: str, candidate_keywords: List[str]) -> Optional[Dict[str, float]]:
+        """
+        Parse batch relevance response into clamped scores
+        
+        Args:
+            content: Raw LLM response text
+            candidate_keywords: Keywords that were rated
+            
+        Returns:
+            Dictionary mapping the keywords the model rated to relevance scores,
+            or None when it rated none of them
+        """
+        # Parse JSON
+        content = _strip_fences(content.strip())
+        scores = fast_json.loads(content)
+        
+        # Normalize and validate scores; keywords the model left out stay unscored
+        rated = [kw for kw in candidate_keywords if kw in scores]
+        values = np.fromiter(
+            (float(scores[kw]) for kw in rated),
+            dtype=np.float64,
+            count=len(rated)
+        )
+        
+        if not rated:
+            return None
+        
+        return dict(zip(rated, np.clip(values, 0.0, 1.0).tolist()))
 
 
 # Example usage
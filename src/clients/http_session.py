@@ -0,0 +1,39 @@
+"""
+Shared HTTP Session with Connection Pooling and Retries
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_size: int = 20, retries: int = 3) -> requests.Session:
+    """
+    Create a keep-alive session shared by the API clients
+    
+    Args:
+        pool_size: Connections kept open per host
+        retries: Retries for connection errors and 429/5xx responses
+        
+    Returns:
+        Configured requests session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # Wait as long as a 429 asks instead of a fixed pessimistic delay
+        respect_retry_after_header=True,
+        # Hand the last response back so clients report the API's error message
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
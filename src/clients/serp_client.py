@@ -3,19 +3,95 @@ SERP API Client for Search Results and Competition Analysis
 """
 import os
 import time
-from typing import Dict, List, Optional
-from serpapi import GoogleSearch
+import asyncio
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import httpx
+import numpy as np
+import requests
+from aiolimiter import AsyncLimiter
+from tqdm import tqdm
+
+from src.cache.kv_cache import KVCache
+from src.clients.http_session import create_session
+from src.utils import backoff, fast_json
+
+
+SERP_ENDPOINT = "https://serpapi.com/search.json"
+
+# Responses worth retrying after a pause (rate limited or transient server errors)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# High authority domains for competition analysis
+HIGH_AUTHORITY_DOMAINS = frozenset({
+    'wikipedia.org', 'amazon.com', 'linkedin.com',
+    'indeed.com', 'glassdoor.com', 'forbes.com',
+    'nytimes.com', 'medium.com', 'reddit.com',
+    'youtube.com', 'stackoverflow.com', 'github.com',
+    'quora.com', 'bbc.com', 'cnn.com'
+})
+
+# Competition points by total results: >100K, >1M, >10M, >100M
+_RESULTS_THRESH = np.array([100000, 1000000, 10000000, 100000000])
+_RESULTS_POINTS = np.array([0, 5, 10, 15, 20])
+
+# Base first page probability by competition score: <20, <40, <60, <80, rest
+_PROBABILITY_THRESH = np.array([20, 40, 60, 80])
+_PROBABILITY_BASE = np.array([0.85, 0.65, 0.45, 0.25, 0.10])
+
+
+@lru_cache(maxsize=4096)
+def _is_big_brand(domain: str) -> bool:
+    """
+    Check whether a result's domain belongs to a high authority site
+    
+    Args:
+        domain: Result domain or displayed link (e.g. "https://en.wikipedia.org › wiki")
+        
+    Returns:
+        True if the host or one of its parent domains is high authority, also
+        under a trailing country code (amazon.com.br, www.amazon.com.au)
+    """
+    host = domain.lower().split('://', 1)[-1]
+    host = host.split('/', 1)[0].split(' ', 1)[0].split(':', 1)[0]
+    
+    # Regional sites append a country code to the authority's domain
+    if host.count('.') >= 2 and len(host.rpartition('.')[2]) == 2:
+        return _has_authority_suffix(host) or _has_authority_suffix(host[:-3])
+    
+    return _has_authority_suffix(host)
+
+
+def _has_authority_suffix(host: str) -> bool:
+    """Check a bare host and its parent domains against HIGH_AUTHORITY_DOMAINS"""
+    # Walk en.wikipedia.org -> wikipedia.org by peeling one label at a time;
+    # every authority has at least two labels, so the bare TLD is never looked up
+    while '.' in host:
+        if host in HIGH_AUTHORITY_DOMAINS:
+            return True
+        host = host.split('.', 1)[1]
+    
+    return False
 
 
 class SerpClient:
     """Client for interacting with SERP API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self, 
+        api_key: str = None, 
+        cache: Optional[KVCache] = None, 
+        session: Optional[requests.Session] = None
+    ):
         """
         Initialize SERP API client
         
         Args:
             api_key: SERP API key (optional, will use env var if not provided)
+            cache: Persistent cache for competition analyses (optional)
+            session: Shared keep-alive HTTP session (optional, a pooled
+                session is created if not provided)
         """
         self.api_key = api_key or os.getenv('SERP_API_KEY')
         if not self.api_key:
@@ -25,16 +101,23 @@ class SerpClient:
         self.language = os.getenv('SERP_LANGUAGE', 'en')
         self.country = os.getenv('SERP_COUNTRY', 'us')
         self.max_retries = 3
-        self.retry_delay = 1
+        self.session = session if session is not None else create_session()
+        
+        # Cached SERP data goes stale, expire it after a week by default
+        self.cache = cache
+        self.cache_ttl = float(os.getenv('SERP_CACHE_TTL', str(7 * 24 * 3600)))
         
-        # High authority domains for competition analysis
-        self.high_authority_domains = [
-            'wikipedia.org', 'amazon.com', 'linkedin.com',
-            'indeed.com', 'glassdoor.com', 'forbes.com',
-            'nytimes.com', 'medium.com', 'reddit.com',
-            'youtube.com', 'stackoverflow.com', 'github.com',
-            'quora.com', 'bbc.com', 'cnn.com'
-        ]
+        # Raw search responses are shared by related searches, PAA and competition
+        # analysis; keep them for a day by default
+        self.search_cache_ttl = float(os.getenv('SERP_SEARCH_CACHE_TTL', str(24 * 3600)))
+        self._pending_searches: Dict[str, asyncio.Future] = {}
+        
+        # Token bucket at the plan's request rate; 429s back off on Retry-After
+        self.rpm = int(os.getenv('SERP_RPM', '100'))
+        self.limiter = AsyncLimiter(self.rpm, 60)
+        
+        # SerpAPI's cap on searches in flight at once
+        self.max_concurrency = int(os.getenv('SERP_MAX_CONCURRENCY', '10'))
     
     def search(self, keyword: str, num_results: int = 10) -> Dict:
         """
@@ -47,7 +130,113 @@ class SerpClient:
         Returns:
             Search results dictionary
         """
-        params = {
+        key = self._search_cache_key(keyword, num_results)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        
+        return self._store_search(key, self._fetch_search(keyword, num_results))
+    
+    def _fetch_search(self, keyword: str, num_results: int) -> Dict:
+        """Request search results from the API (uncached)"""
+        params = self._build_params(keyword, num_results)
+        
+        # Pooled connections; the session's adapter handles retries
+        response = self.session.get(SERP_ENDPOINT, params=params, timeout=30)
+        results = fast_json.loads(response.content)
+        
+        # Report the API's message rather than the URL (it carries the key)
+        if response.status_code != 200 or 'error' in results:
+            raise RuntimeError(results.get('error', f"HTTP {response.status_code}"))
+        return results
+    
+    async def search_async(
+        self, 
+        keyword: str, 
+        client: httpx.AsyncClient, 
+        num_results: int = 10
+    ) -> Dict:
+        """
+        Perform Google search for keyword without blocking the event loop
+        
+        Args:
+            keyword: Search query
+            client: Shared httpx client used for the request
+            num_results: Number of results to fetch
+            
+        Returns:
+            Search results dictionary
+        """
+        key = self._search_cache_key(keyword, num_results)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        
+        # Concurrent callers for the same search share one request
+        pending = self._pending_searches.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_search_async(key, keyword, client, num_results))
+            self._pending_searches[key] = pending
+            pending.add_done_callback(lambda _: self._pending_searches.pop(key, None))
+        
+        # Shielded so one cancelled caller does not cancel the others' request
+        return await asyncio.shield(pending)
+    
+    async def _fetch_search_async(
+        self, 
+        key: str, 
+        keyword: str, 
+        client: httpx.AsyncClient, 
+        num_results: int
+    ) -> Dict:
+        """Request search results from the API (uncached) and store them"""
+        params = self._build_params(keyword, num_results)
+        
+        for attempt in range(self.max_retries + 1):
+            async with self.limiter:
+                response = await client.get(SERP_ENDPOINT, params=params)
+            
+            status = response.status_code
+            if status not in RETRY_STATUSES or attempt == self.max_retries:
+                try:
+                    results = fast_json.loads(response.content)
+                except ValueError:
+                    results = {}
+                
+                # Report the API's message rather than the URL (it carries the key)
+                if status != 200 or 'error' in results:
+                    raise RuntimeError(results.get('error', f"HTTP {status}"))
+                return self._store_search(key, results)
+            
+            retry_after = response.headers.get('Retry-After')
+            await asyncio.sleep(backoff.delay(attempt, 0.5, retry_after))
+        
+        return {}
+    
+    def _search_cache_key(self, keyword: str, num_results: int) -> str:
+        """Cache key for a search in the configured locale"""
+        return KVCache.make_key(
+            'serp_search', keyword, self.location, self.country, self.language, num_results
+        )
+    
+    def _store_search(self, key: str, results: Dict) -> Dict:
+        """Cache successful search results and pass them through"""
+        if self.cache is not None and results and 'error' not in results:
+            self.cache.set(key, results, ttl=self.search_cache_ttl)
+        return results
+    
+    def _build_params(self, keyword: str, num_results: int = 10) -> Dict:
+        """
+        Build SERP API query parameters
+        
+        Args:
+            keyword: Search query
+            num_results: Number of results to fetch
+            
+        Returns:
+            Query parameters dictionary
+        """
+        return {
             'q': keyword,
             'api_key': self.api_key,
             'engine': 'google',
@@ -56,20 +245,6 @@ class SerpClient:
             'hl': self.language,
             'num': num_results
         }
-        
-        for attempt in range(self.max_retries):
-            try:
-                search = GoogleSearch(params)
-                results = search.get_dict()
-                return results
-            except Exception as e:
-                print(f"Search attempt {attempt + 1} failed for '{keyword}': {str(e)}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    raise
-        
-        return {}
     
     def get_related_searches(self, keyword: str) -> List[str]:
         """
@@ -82,9 +257,28 @@ class SerpClient:
             List of related search keywords
         """
         try:
-            results = self.search(keyword)
-            related = results.get('related_searches', [])
-            return [item['query'] for item in related if 'query' in item]
+            return self._related_searches_from(self.search(keyword))
+        except Exception as e:
+            print(f"Error getting related searches: {str(e)}")
+            return []
+    
+    async def get_related_searches_async(
+        self, 
+        keyword: str, 
+        client: httpx.AsyncClient
+    ) -> List[str]:
+        """
+        Get related searches for keyword without blocking the event loop
+        
+        Args:
+            keyword: Search query
+            client: Shared httpx client used for the request
+            
+        Returns:
+            List of related search keywords
+        """
+        try:
+            return self._related_searches_from(await self.search_async(keyword, client))
         except Exception as e:
             print(f"Error getting related searches: {str(e)}")
             return []
@@ -100,13 +294,42 @@ class SerpClient:
             List of PAA questions
         """
         try:
-            results = self.search(keyword)
-            paa = results.get('related_questions', [])
-            return [item['question'] for item in paa if 'question' in item]
+            return self._people_also_ask_from(self.search(keyword))
+        except Exception as e:
+            print(f"Error getting PAA: {str(e)}")
+            return []
+    
+    async def get_people_also_ask_async(
+        self, 
+        keyword: str, 
+        client: httpx.AsyncClient
+    ) -> List[str]:
+        """
+        Get "People Also Ask" questions without blocking the event loop
+        
+        Args:
+            keyword: Search query
+            client: Shared httpx client used for the request
+            
+        Returns:
+            List of PAA questions
+        """
+        try:
+            return self._people_also_ask_from(await self.search_async(keyword, client))
         except Exception as e:
             print(f"Error getting PAA: {str(e)}")
             return []
     
+    def _related_searches_from(self, results: Dict) -> List[str]:
+        """Extract related search queries from search results"""
+        related = results.get('related_searches', [])
+        return [item['query'] for item in related if 'query' in item]
+    
+    def _people_also_ask_from(self, results: Dict) -> List[str]:
+        """Extract "People Also Ask" questions from search results"""
+        paa = results.get('related_questions', [])
+        return [item['question'] for item in paa if 'question' in item]
+    
     def analyze_competition(self, keyword: str) -> Dict:
         """
         Comprehensive competition analysis for keyword
@@ -117,144 +340,299 @@ class SerpClient:
         Returns:
             Competition analysis dictionary
         """
+        cached = self._cached_analysis(keyword)
+        if cached is not None:
+            return cached
+        
         try:
             results = self.search(keyword, num_results=10)
+            return self._store_analysis(self._build_competition_analysis(keyword, results))
+        
+        except Exception as e:
+            tqdm.write(f"Error analyzing competition for '{keyword}': {str(e)}")
+            return self._competition_error(keyword, e)
+    
+    async def analyze_competition_async(
+        self, 
+        keyword: str, 
+        client: httpx.AsyncClient
+    ) -> Dict:
+        """
+        Competition analysis for keyword without blocking the event loop
+        
+        Args:
+            keyword: Keyword to analyze
+            client: Shared httpx client used for the request
             
-            organic_results = results.get('organic_results', [])[:10]
-            
-            analysis = {
-                'keyword': keyword,
-                'total_results': results.get('search_information', {}).get('total_results', 0),
-                'organic_results_count': len(organic_results),
-                'big_brands_count': 0,
-                'has_featured_snippet': 'featured_snippet' in results or 'answer_box' in results,
-                'has_knowledge_graph': 'knowledge_graph' in results,
-                'has_ads': 'ads' in results or 'top_ads' in results,
-                'serp_features_count': 0,
-                'domains': [],
-                'competition_score': 0,
-                'first_page_probability': 0.0
-            }
-            
-            # Analyze top 10 organic results
-            for result in organic_results:
-                domain = result.get('domain', result.get('displayed_link', ''))
-                analysis['domains'].append(domain)
-                
-                # Check for high authority domains
-                if any(auth_domain in domain.lower() for auth_domain in self.high_authority_domains):
-                    analysis['big_brands_count'] += 1
-            
-            # Count SERP features
-            if analysis['has_featured_snippet']:
-                analysis['serp_features_count'] += 1
-            if analysis['has_knowledge_graph']:
-                analysis['serp_features_count'] += 1
-            if analysis['has_ads']:
-                analysis['serp_features_count'] += 1
-            
-            # Calculate competition score (0-100)
-            # Higher score = harder to rank
-            competition_score = 0
-            
-            # Big brands factor (0-50 points)
-            competition_score += min(analysis['big_brands_count'] * 10, 50)
-            
-            # SERP features factor (0-30 points)
-            if analysis['has_featured_snippet']:
-                competition_score += 10
-            if analysis['has_knowledge_graph']:
-                competition_score += 10
-            if analysis['has_ads']:
-                competition_score += 10
-            
-            # Total results factor (0-20 points)
-            total_results = analysis['total_results']
-            if total_results > 100000000:
-                competition_score += 20
-            elif total_results > 10000000:
-                competition_score += 15
-            elif total_results > 1000000:
-                competition_score += 10
-            elif total_results > 100000:
-                competition_score += 5
-            
-            analysis['competition_score'] = min(competition_score, 100)
+        Returns:
+            Competition analysis dictionary
+        """
+        cached = self._cached_analysis(keyword)
+        if cached is not None:
+            return cached
+        
+        try:
+            results = await self.search_async(keyword, client, num_results=10)
+            return self._store_analysis(self._build_competition_analysis(keyword, results))
+        
+        except Exception as e:
+            tqdm.write(f"Error analyzing competition for '{keyword}': {str(e)}")
+            return self._competition_error(keyword, e)
+    
+    def _analysis_cache_key(self, keyword: str) -> str:
+        """Cache key for a keyword's analysis in the configured locale"""
+        return KVCache.make_key('serp', keyword, self.location, self.country, self.language)
+    
+    def _cached_analysis(self, keyword: str) -> Optional[Dict]:
+        """Return a fresh cached analysis for keyword, if any"""
+        if self.cache is None:
+            return None
+        return self.cache.get(self._analysis_cache_key(keyword))
+    
+    def _store_analysis(self, analysis: Dict) -> Dict:
+        """Cache a successful analysis and pass it through"""
+        if self.cache is not None:
+            self.cache.set(
+                self._analysis_cache_key(analysis['keyword']),
+                analysis,
+                ttl=self.cache_ttl
+            )
+        return analysis
+    
+    def _build_competition_analysis(self, keyword: str, results: Dict) -> Dict:
+        """
+        Build competition analysis from raw search results
+        
+        Args:
+            keyword: Analyzed keyword
+            results: Search results dictionary
             
-            # Estimate first page probability
-            analysis['first_page_probability'] = self._estimate_first_page_probability(analysis)
+        Returns:
+            Competition analysis dictionary
+        """
+        return self._score_competition([self._serp_features(keyword, results)])[0]
+    
+    def _serp_features(self, keyword: str, results: Dict) -> Dict:
+        """
+        Extract the unscored SERP features of one search
+        
+        Args:
+            keyword: Analyzed keyword
+            results: Search results dictionary
             
-            return analysis
+        Returns:
+            Competition analysis dictionary with scores still to be filled in
+        """
+        organic_results = results.get('organic_results', [])[:10]
+        
+        analysis = {
+            'keyword': keyword,
+            'total_results': results.get('search_information', {}).get('total_results', 0),
+            'organic_results_count': len(organic_results),
+            'big_brands_count': 0,
+            'has_featured_snippet': 'featured_snippet' in results or 'answer_box' in results,
+            'has_knowledge_graph': 'knowledge_graph' in results,
+            'has_ads': 'ads' in results or 'top_ads' in results,
+            'serp_features_count': 0,
+            'domains': [],
+            'competition_score': 0,
+            'first_page_probability': 0.0
+        }
+        
+        # Analyze top 10 organic results
+        for result in organic_results:
+            domain = result.get('domain', result.get('displayed_link', ''))
+            analysis['domains'].append(domain)
             
-        except Exception as e:
-            print(f"Error analyzing competition for '{keyword}': {str(e)}")
-            return {
-                'keyword': keyword,
-                'error': str(e),
-                'competition_score': 50,  # Default medium competition
-                'first_page_probability': 0.3
-            }
+            # Check for high authority domains
+            if _is_big_brand(domain):
+                analysis['big_brands_count'] += 1
+        
+        # Count SERP features
+        analysis['serp_features_count'] = sum((
+            analysis['has_featured_snippet'],
+            analysis['has_knowledge_graph'],
+            analysis['has_ads']
+        ))
+        
+        return analysis
     
-    def _estimate_first_page_probability(self, analysis: Dict) -> float:
+    def _score_competition(self, analyses: List[Dict]) -> List[Dict]:
         """
-        Estimate probability of ranking on first page
+        Fill in competition scores and first page probabilities in one pass
         
         Args:
-            analysis: Competition analysis dictionary
+            analyses: Analyses from _serp_features (updated in place)
             
         Returns:
-            Probability score (0.0 to 1.0)
+            The same analyses
         """
-        comp_score = analysis['competition_score']
-        big_brands = analysis['big_brands_count']
-        serp_features = analysis['serp_features_count']
+        if not analyses:
+            return analyses
         
-        # Base probability by competition score
-        if comp_score < 20:
-            base_prob = 0.85
-        elif comp_score < 40:
-            base_prob = 0.65
-        elif comp_score < 60:
-            base_prob = 0.45
-        elif comp_score < 80:
-            base_prob = 0.25
-        else:
-            base_prob = 0.10
+        big_brands = np.array([a['big_brands_count'] for a in analyses])
+        serp_features = np.array([a['serp_features_count'] for a in analyses])
+        total_results = np.array([a['total_results'] for a in analyses], dtype=np.float64)
         
-        # Adjust for big brands
-        brand_penalty = min(big_brands * 0.08, 0.30)
+        # Calculate competition score (0-100); higher score = harder to rank.
+        # Big brands give 0-50 points, SERP features 10 each, total results 0-20
+        competition = (
+            np.minimum(big_brands * 10, 50)
+            + serp_features * 10
+            + _RESULTS_POINTS[np.searchsorted(_RESULTS_THRESH, total_results, side='left')]
+        )
+        competition = np.minimum(competition, 100)
         
-        # Adjust for SERP features
-        feature_penalty = min(serp_features * 0.05, 0.20)
+        # First page probability: base rate by competition score, minus penalties
+        # for big brands and SERP features
+        base = _PROBABILITY_BASE[np.searchsorted(_PROBABILITY_THRESH, competition, side='right')]
+        brand_penalty = np.minimum(big_brands * 0.08, 0.30)
+        feature_penalty = np.minimum(serp_features * 0.05, 0.20)
+        probability = np.maximum(base - brand_penalty - feature_penalty, 0.05)
         
-        # Calculate final probability
-        final_probability = max(base_prob - brand_penalty - feature_penalty, 0.05)
+        for analysis, score, prob in zip(analyses, competition.tolist(), probability.tolist()):
+            analysis['competition_score'] = score
+            analysis['first_page_probability'] = round(prob, 2)
         
-        return round(final_probability, 2)
+        return analyses
+    
+    def _competition_error(self, keyword: str, error: Exception) -> Dict:
+        """Fallback analysis returned when a search fails"""
+        return {
+            'keyword': keyword,
+            'error': str(error),
+            'competition_score': 50,  # Default medium competition
+            'first_page_probability': 0.3
+        }
     
-    def batch_analyze_keywords(self, keywords: List[str], delay: float = 0.5) -> List[Dict]:
+    def batch_analyze_keywords(self, keywords: List[str], delay: float = 0.0) -> List[Dict]:
         """
         Analyze multiple keywords with rate limiting
         
         Args:
             keywords: List of keywords to analyze
-            delay: Delay between requests (seconds)
-            
+            delay: Extra delay between requests (seconds); the pooled session
+                already backs off on 429 responses
+                
         Returns:
             List of analysis dictionaries
         """
         results = []
+        fresh = []
+        cached = {keyword: self._cached_analysis(keyword) for keyword in keywords}
+        searches = self._prefetched_searches(
+            [keyword for keyword in keywords if cached[keyword] is None],
+            delay
+        )
         
         for i, keyword in enumerate(keywords):
-            print(f"Analyzing {i+1}/{len(keywords)}: {keyword}")
-            analysis = self.analyze_competition(keyword)
+            tqdm.write(f"Analyzing {i+1}/{len(keywords)}: {keyword}")
+            
+            if cached[keyword] is not None:
+                results.append(cached[keyword])
+                continue
+            
+            # Parse this response while the next search is already in flight
+            _, future = next(searches)
+            try:
+                search_results = future.result()
+                analysis = self._serp_features(keyword, search_results)
+                fresh.append(analysis)
+            
+            except Exception as e:
+                tqdm.write(f"Error analyzing competition for '{keyword}': {str(e)}")
+                analysis = self._competition_error(keyword, e)
+            
             results.append(analysis)
+        
+        # Score every fresh search together, then cache
+        for analysis in self._score_competition(fresh):
+            self._store_analysis(analysis)
+        
+        return results
+    
+    async def batch_analyze_keywords_async(
+        self, 
+        keywords: List[str], 
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[Dict]:
+        """
+        Analyze multiple keywords concurrently
+        
+        Requests are paced by the rate limiter and capped at max_concurrency
+        in flight, instead of running one after another.
+        
+        Args:
+            keywords: List of keywords to analyze
+            client: Shared httpx client (optional, a temporary HTTP/2 client is
+                opened if not provided)
+                
+        Returns:
+            List of analysis dictionaries, in keyword order
+        """
+        if client is None:
+            async with httpx.AsyncClient(http2=True, timeout=30) as own_client:
+                return await self.batch_analyze_keywords_async(keywords, own_client)
+        
+        semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+        fresh = []
+        
+        async def analyze(keyword: str) -> Dict:
+            cached = self._cached_analysis(keyword)
+            if cached is not None:
+                return cached
             
-            # Rate limiting
-            if i < len(keywords) - 1:
-                time.sleep(delay)
+            try:
+                async with semaphore:
+                    search_results = await self.search_async(keyword, client, num_results=10)
+                
+                analysis = self._serp_features(keyword, search_results)
+                fresh.append(analysis)
+                return analysis
+            
+            except Exception as e:
+                tqdm.write(f"Error analyzing competition for '{keyword}': {str(e)}")
+                return self._competition_error(keyword, e)
+        
+        results = list(await asyncio.gather(*(analyze(keyword) for keyword in keywords)))
+        
+        # Score every fresh search together, then cache
+        for analysis in self._score_competition(fresh):
+            self._store_analysis(analysis)
         
         return results
+    
+    def _prefetched_searches(
+        self, 
+        keywords: List[str], 
+        delay: float
+    ) -> Iterator[Tuple[str, Future]]:
+        """
+        Run searches on a background thread, one request ahead of the consumer
+        
+        Args:
+            keywords: Keywords to search, in order
+            delay: Delay between requests (seconds)
+            
+        Yields:
+            (keyword, future of its search results)
+        """
+        def delayed_search(keyword: str, wait: float) -> Dict:
+            # Rate limiting
+            if wait:
+                time.sleep(wait)
+            return self.search(keyword, num_results=10)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            for i, keyword in enumerate(keywords):
+                future = executor.submit(delayed_search, keyword, delay if i else 0)
+                if pending is not None:
+                    yield pending
+                pending = (keyword, future)
+            
+            if pending is not None:
+                yield pending
 
 
 # Example usage
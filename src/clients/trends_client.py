@@ -2,27 +2,111 @@
 Google Trends Client for Search Volume Estimation
 """
 import os
+import asyncio
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from typing import Dict, List, Optional
+import numpy as np
 from pytrends.request import TrendReq
 import time
 
+from src.cache.kv_cache import KVCache
+from src.utils import backoff
+
+
+# Most keywords Google Trends compares in one payload
+PAYLOAD_MAX_KEYWORDS = 5
+
+# Window every interest request covers
+TIMEFRAME = 'today 12-m'
+
+# Most interest results kept in memory; least recently used go first
+MEMO_MAXSIZE = 4096
+
+
+class _TokenBucket:
+    """Thread-safe token bucket shared by every thread issuing Trends requests"""
+    
+    def __init__(self, rate: float, capacity: int):
+        """
+        Create a full bucket
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it (no limit if rate <= 0)"""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait)
+
 
 class TrendsClient:
     """Client for Google Trends data"""
     
-    def __init__(self):
-        """Initialize Google Trends client"""
+    def __init__(self, cache: Optional[KVCache] = None, max_workers: Optional[int] = None):
+        """
+        Initialize Google Trends client
+        
+        Args:
+            cache: Persistent cache for interest data (optional)
+            max_workers: Concurrent requests (optional, will use env var if not provided)
+        """
         self.enabled = os.getenv('GOOGLE_TRENDS_ENABLED', 'true').lower() == 'true'
+        self._local = threading.local()
         
         if self.enabled:
             try:
-                self.pytrends = TrendReq(hl='en-US', tz=360)
+                self._local.pytrends = TrendReq(hl='en-US', tz=360)
             except Exception as e:
                 print(f"Warning: Could not initialize Google Trends: {str(e)}")
                 self.enabled = False
         
         self.retry_delay = 2
         self.max_retries = 3
+        
+        # Google throttles aggressively; pace requests across all threads
+        self.rpm = float(os.getenv('TRENDS_RPM', '30'))
+        self.max_workers = max_workers or int(os.getenv('TRENDS_MAX_WORKERS', '10'))
+        self._bucket = _TokenBucket(self.rpm / 60.0, self.max_workers)
+        
+        # Interest is fetched once per keyword (volume and trend both need it),
+        # kept in a bounded in-memory LRU and persisted for a day by default
+        self.cache = cache
+        self.cache_ttl = float(os.getenv('TRENDS_CACHE_TTL', str(24 * 3600)))
+        self._interest: OrderedDict[str, Dict] = OrderedDict()  # Keyed like the persistent cache
+        self._interest_lock = threading.Lock()
+    
+    @property
+    def pytrends(self) -> TrendReq:
+        """Per-thread pytrends session (TrendReq keeps payload state between calls)"""
+        pytrends = getattr(self._local, 'pytrends', None)
+        if pytrends is None:
+            pytrends = TrendReq(hl='en-US', tz=360)
+            self._local.pytrends = pytrends
+        return pytrends
     
     def get_interest_over_time(self, keyword: str) -> Dict:
         """
@@ -37,47 +121,222 @@ class TrendsClient:
         if not self.enabled:
             return {'average_interest': 50, 'trend': 'stable'}
         
+        cached = self._cached_interest([keyword])
+        if keyword in cached:
+            return cached[keyword]
+        
         for attempt in range(self.max_retries):
             try:
                 # Build payload
-                self.pytrends.build_payload([keyword], timeframe='today 12-m')
+                self._bucket.acquire()
+                self.pytrends.build_payload([keyword], timeframe=TIMEFRAME)
                 
                 # Get interest over time
                 interest_df = self.pytrends.interest_over_time()
                 
                 if interest_df.empty:
-                    return {'average_interest': 0, 'trend': 'no_data'}
-                
-                # Calculate average interest
-                avg_interest = int(interest_df[keyword].mean())
-                
-                # Determine trend
-                recent = interest_df[keyword].tail(3).mean()
-                older = interest_df[keyword].head(3).mean()
+                    interest = {'average_interest': 0, 'trend': 'no_data'}
+                else:
+                    interest = self._summarize_interest(interest_df[keyword].to_numpy())
                 
-                if recent > older * 1.2:
-                    trend = 'rising'
-                elif recent < older * 0.8:
-                    trend = 'declining'
+                return self._store_interest({keyword: interest})[keyword]
+            
+            except Exception as e:
+                print(f"Trends attempt {attempt + 1} failed: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(backoff.delay(attempt, self.retry_delay, backoff.retry_after(e)))
                 else:
-                    trend = 'stable'
+                    # Return default values on failure, flagged so callers can
+                    # tell them from real data
+                    return {'average_interest': 50, 'trend': 'stable', 'error': str(e)}
+        
+        return {'average_interest': 50, 'trend': 'stable', 'error': 'no attempts made'}
+    
+    def batch_interest_over_time(
+        self, 
+        keywords: List[str], 
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Get interest over time for several keywords, five per request
+        
+        Trends scales every keyword in a payload against the group's peak, so
+        each series is rescaled to its own peak of 100 to match what a
+        single-keyword request reports.
+        
+        Args:
+            keywords: Keywords to analyze
+            max_workers: Concurrent requests (optional, defaults to the client's max_workers)
+            
+        Returns:
+            Dictionary mapping keywords to trend data
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not self.enabled:
+            return {keyword: {'average_interest': 50, 'trend': 'stable'} for keyword in keywords}
+        
+        # Only keywords without a cached result are requested
+        interest = self._cached_interest(keywords, batched=True)
+        remaining = iter([keyword for keyword in keywords if keyword not in interest])
+        groups = iter(lambda: list(islice(remaining, PAYLOAD_MAX_KEYWORDS)), [])
+        
+        workers = self.max_workers if max_workers is None else max_workers
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for group_interest in executor.map(self._group_interest_over_time, groups):
+                interest.update(group_interest)
+        
+        return {keyword: interest[keyword] for keyword in keywords}
+    
+    def _group_interest_over_time(self, group: List[str]) -> Dict[str, Dict]:
+        """
+        Get interest over time for up to five keywords in one payload
+        
+        Args:
+            group: Keywords sharing the payload
+            
+        Returns:
+            Dictionary mapping keywords to trend data
+        """
+        error = 'no attempts made'
+        for attempt in range(self.max_retries):
+            try:
+                self._bucket.acquire()
+                self.pytrends.build_payload(group, timeframe=TIMEFRAME)
+                interest_df = self.pytrends.interest_over_time()
                 
-                return {
-                    'average_interest': avg_interest,
-                    'trend': trend,
-                    'max_interest': int(interest_df[keyword].max()),
-                    'min_interest': int(interest_df[keyword].min())
-                }
+                interest = {}
+                for keyword in group:
+                    if interest_df.empty or keyword not in interest_df:
+                        interest[keyword] = {'average_interest': 0, 'trend': 'no_data'}
+                        continue
+                    
+                    values = interest_df[keyword].to_numpy()
+                    peak = values.max()
+                    if peak > 0:
+                        values = values * (100.0 / peak)
+                    interest[keyword] = self._summarize_interest(values)
                 
+                return self._store_interest(interest, batched=True)
+            
             except Exception as e:
                 print(f"Trends attempt {attempt + 1} failed: {str(e)}")
+                error = str(e)
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    # Return default values on failure
-                    return {'average_interest': 50, 'trend': 'stable'}
+                    time.sleep(backoff.delay(attempt, self.retry_delay, backoff.retry_after(e)))
         
-        return {'average_interest': 50, 'trend': 'stable'}
+        # Return default values on failure, flagged like get_interest_over_time's
+        return {keyword: {'average_interest': 50, 'trend': 'stable', 'error': error} for keyword in group}
+    
+    def _interest_cache_key(self, keyword: str, batched: bool = False) -> str:
+        """
+        Cache key for a keyword's interest over the request timeframe
+        
+        Shared payloads quantize every series against the group's peak, so a
+        low-interest keyword loses precision next to a popular one. Batched
+        results are kept under their own keys and never answer a
+        single-keyword lookup.
+        
+        Args:
+            keyword: Keyword the interest belongs to
+            batched: Whether the interest came from a shared payload
+            
+        Returns:
+            Cache key
+        """
+        return KVCache.make_key('trends-batch' if batched else 'trends', keyword, TIMEFRAME)
+    
+    def _cached_interest(self, keywords: List[str], batched: bool = False) -> Dict[str, Dict]:
+        """
+        Look up interest fetched earlier in this process or a previous run
+        
+        Args:
+            keywords: Keywords to look up
+            batched: Also accept results of shared payloads (single-keyword
+                results are preferred when both exist)
+                
+        Returns:
+            Dictionary with the keywords that were found
+        """
+        kinds = (False, True) if batched else (False,)
+        keys = {keyword: [self._interest_cache_key(keyword, kind) for kind in kinds] for keyword in keywords}
+        
+        known = self._recall([key for options in keys.values() for key in options])
+        misses = [key for options in keys.values() for key in options if key not in known]
+        if self.cache is not None and misses:
+            loaded = self.cache.get_many(misses)
+            self._memoize(loaded)
+            known.update(loaded)
+        
+        found = {}
+        for keyword, options in keys.items():
+            key = next((key for key in options if key in known), None)
+            if key is not None:
+                found[keyword] = known[key]
+        
+        return found
+    
+    def _store_interest(self, interest: Dict[str, Dict], batched: bool = False) -> Dict[str, Dict]:
+        """Remember successfully fetched interest and pass it through"""
+        entries = {self._interest_cache_key(keyword, batched): data for keyword, data in interest.items()}
+        self._memoize(entries)
+        if self.cache is not None:
+            self.cache.set_many(entries, ttl=self.cache_ttl)
+        
+        return interest
+    
+    def _recall(self, keys: List[str]) -> Dict[str, Dict]:
+        """Memoized interest for the keys present, marking them recently used"""
+        found = {}
+        with self._interest_lock:
+            for key in keys:
+                if key in self._interest:
+                    self._interest.move_to_end(key)
+                    found[key] = self._interest[key]
+        
+        return found
+    
+    def _memoize(self, entries: Dict[str, Dict]):
+        """Add interest to the in-memory LRU, evicting beyond MEMO_MAXSIZE"""
+        with self._interest_lock:
+            for key, data in entries.items():
+                self._interest[key] = data
+                self._interest.move_to_end(key)
+            while len(self._interest) > MEMO_MAXSIZE:
+                self._interest.popitem(last=False)
+    
+    def _summarize_interest(self, values: np.ndarray) -> Dict:
+        """
+        Summarize a keyword's interest series
+        
+        Plain NumPy reductions on the column's array; the series is short, so
+        pandas' per-call overhead would dominate.
+        
+        Args:
+            values: Weekly interest values (0-100), oldest first
+            
+        Returns:
+            Dictionary with trend data
+        """
+        # Calculate average interest
+        avg_interest = int(values.mean())
+        
+        # Determine trend
+        recent = values[-3:].mean()
+        older = values[:3].mean()
+        
+        if recent > older * 1.2:
+            trend = 'rising'
+        elif recent < older * 0.8:
+            trend = 'declining'
+        else:
+            trend = 'stable'
+        
+        return {
+            'average_interest': avg_interest,
+            'trend': trend,
+            'max_interest': int(values.max()),
+            'min_interest': int(values.min())
+        }
     
     def get_related_queries(self, keyword: str) -> List[str]:
         """
@@ -93,7 +352,8 @@ class TrendsClient:
             return []
         
         try:
-            self.pytrends.build_payload([keyword], timeframe='today 12-m')
+            self._bucket.acquire()
+            self.pytrends.build_payload([keyword], timeframe=TIMEFRAME)
             related_queries = self.pytrends.related_queries()
             
             queries = []
@@ -109,13 +369,31 @@ class TrendsClient:
                 if rising is not None and not rising.empty:
                     queries.extend(rising['query'].tolist())
             
-            # Remove duplicates
-            return list(set(queries))
-            
+            # Remove duplicates, keeping top queries ahead of rising ones
+            return list(dict.fromkeys(queries))
+        
         except Exception as e:
             print(f"Error getting related queries: {str(e)}")
             return []
     
+    async def get_related_queries_async(self, keyword: str) -> List[str]:
+        """
+        Get related queries from Google Trends without blocking the event loop
+        
+        pytrends is synchronous, so the request runs on a worker thread with
+        its own TrendReq session.
+        
+        Args:
+            keyword: Seed keyword
+            
+        Returns:
+            List of related queries
+        """
+        if not self.enabled:
+            return []
+        
+        return await asyncio.to_thread(self.get_related_queries, keyword)
+    
     def estimate_search_volume(self, keyword: str, base_volume: int = 1000) -> int:
         """
         Estimate monthly search volume based on Google Trends interest
@@ -133,25 +411,33 @@ class TrendsClient:
         
         try:
             interest_data = self.get_interest_over_time(keyword)
-            avg_interest = interest_data['average_interest']
-            
-            # Scale volume based on interest (0-100)
-            # Interest of 100 = 10x base volume
-            # Interest of 50 = 1x base volume
-            # Interest of 0 = 0.1x base volume
-            
-            if avg_interest == 0:
-                estimated_volume = base_volume // 10
-            else:
-                scaling_factor = (avg_interest / 50.0)
-                estimated_volume = int(base_volume * scaling_factor)
-            
-            return max(estimated_volume, 10)  # Minimum 10 searches
-            
+            return self._volume_from_interest(interest_data['average_interest'], base_volume)
+        
         except Exception as e:
             print(f"Error estimating volume: {str(e)}")
             return self._estimate_by_length(keyword)
     
+    def _volume_from_interest(self, avg_interest: int, base_volume: int = 1000) -> int:
+        """
+        Scale volume based on interest (0-100)
+        
+        Interest of 100 = 2x base volume, 50 = 1x base volume, 0 = 0.1x base volume
+        
+        Args:
+            avg_interest: Average Trends interest
+            base_volume: Base volume for scaling
+            
+        Returns:
+            Estimated monthly search volume
+        """
+        if avg_interest == 0:
+            estimated_volume = base_volume // 10
+        else:
+            scaling_factor = (avg_interest / 50.0)
+            estimated_volume = int(base_volume * scaling_factor)
+        
+        return max(estimated_volume, 10)  # Minimum 10 searches
+    
     def _estimate_by_length(self, keyword: str) -> int:
         """
         Fallback: Estimate volume by keyword length
@@ -175,27 +461,40 @@ class TrendsClient:
         else:
             return 500   # Very long-tail
     
-    def batch_estimate_volumes(self, keywords: List[str], delay: float = 2.0) -> Dict[str, int]:
+    def batch_estimate_volumes(
+        self, 
+        keywords: List[str], 
+        delay: Optional[float] = None, 
+        max_workers: Optional[int] = None
+    ) -> Dict[str, int]:
         """
         Estimate volumes for multiple keywords
         
+        Keywords share Trends payloads five at a time (see batch_interest_over_time).
+        
         Args:
             keywords: List of keywords
-            delay: Delay between requests
+            delay: Deprecated and ignored; requests are paced by TRENDS_RPM
+            max_workers: Concurrent requests (optional, defaults to the client's max_workers)
             
         Returns:
             Dictionary mapping keywords to estimated volumes
         """
-        volumes = {}
+        if delay is not None:
+            warnings.warn(
+                "batch_estimate_volumes(delay=...) is ignored; set TRENDS_RPM instead",
+                DeprecationWarning,
+                stacklevel=2
+            )
         
-        for i, keyword in enumerate(keywords):
-            volumes[keyword] = self.estimate_search_volume(keyword)
-            
-            # Rate limiting for Google Trends
-            if i < len(keywords) - 1 and self.enabled:
-                time.sleep(delay)
+        if not self.enabled:
+            return {keyword: self._estimate_by_length(keyword) for keyword in keywords}
         
-        return volumes
+        interest = self.batch_interest_over_time(keywords, max_workers=max_workers)
+        return {
+            keyword: self._volume_from_interest(interest[keyword]['average_interest'])
+            for keyword in keywords
+        }
 
 
 # Example usage
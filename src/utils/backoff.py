@@ -0,0 +1,46 @@
+"""
+Retry Pauses: Honor Retry-After, Otherwise Jittered Exponential Backoff
+"""
+import random
+from typing import Optional
+
+
+# Longest pause when the server does not say how long to wait
+MAX_DELAY = 30.0
+
+
+def delay(attempt: int, base_delay: float = 1.0, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retrying
+    
+    Args:
+        attempt: Zero-based number of the attempt that just failed
+        base_delay: Backoff ceiling for the first retry (doubles per attempt)
+        retry_after: Retry-After header value, if the server sent one
+        
+    Returns:
+        The server's Retry-After when given in seconds, else a random pause up
+        to the exponential backoff ceiling ("full jitter")
+    """
+    try:
+        return max(float(retry_after), 0.0)
+    except (TypeError, ValueError):
+        # Missing or HTTP-date header
+        return random.uniform(0, min(base_delay * (2 ** attempt), MAX_DELAY))
+
+
+def retry_after(error: BaseException) -> Optional[str]:
+    """
+    Retry-After header of the HTTP response attached to an API error
+    
+    Args:
+        error: Exception raised by an HTTP client or SDK
+        
+    Returns:
+        Header value, or None when the error carries no response or header
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers is None:
+        return None
+    return headers.get('Retry-After')
@@ -0,0 +1,8 @@
+"""
+Shared pytest setup
+"""
+import sys
+from pathlib import Path
+
+# Make `src` importable the same way main.py does
+sys.path.insert(0, str(Path(__file__).parent.parent))
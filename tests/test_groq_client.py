@@ -0,0 +1,128 @@
+"""
+Tests for LLM relevance scoring and its caches
+"""
+import asyncio
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from src.cache.kv_cache import KVCache
+from src.clients.groq_client import GroqClient
+
+
+def _response(content):
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = KVCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def client(cache):
+    """LLM-scoring client whose completions are served from .replies"""
+    client = GroqClient(api_key='test', cache=cache, use_llm=True)
+    client.replies = []
+    client.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(
+        create=lambda **kwargs: _response(client.replies.pop(0))
+    )))
+    return client
+
+
+def _stored(client, cache, seed, keywords):
+    """Relevance rows for the keywords, with their expiry"""
+    rows = {}
+    for kw in keywords:
+        row = cache._conn.execute(
+            'SELECT value, expires_at FROM kv WHERE key = ?',
+            (client._relevance_cache_key(seed, kw),)
+        ).fetchone()
+        if row is not None:
+            rows[kw] = row
+    return rows
+
+
+def test_keywords_the_model_skipped_are_not_scored_or_cached(client, cache):
+    client.replies = ['{"a kw": 0.9}']
+    
+    assert client.batch_calculate_relevance('seed', ['a kw', 'b kw']) == {'a kw': 0.9}
+    
+    stored = _stored(client, cache, 'seed', ['a kw', 'b kw'])
+    assert list(stored) == ['a kw']
+    assert stored['a kw'][1] is not None
+    
+    # Only the skipped keyword is asked about again
+    client.replies = ['{"b kw": 0.4}']
+    assert client.batch_calculate_relevance('seed', ['a kw', 'b kw']) == {'a kw': 0.9, 'b kw': 0.4}
+    assert client.replies == []
+
+
+def test_failed_individual_fallback_is_not_scored(client, cache):
+    # Batch reply is not JSON, then one individual reply is not a number
+    client.replies = ['no json here', '0.7', 'very relevant']
+    
+    assert client.batch_calculate_relevance('seed', ['a kw', 'b kw']) == {'a kw': 0.7}
+    assert _stored(client, cache, 'seed', ['a kw', 'b kw']) == {}
+    
+    # The unparseable reply is neither cached nor mistaken for a score
+    client.replies = ['0.3']
+    assert client.calculate_relevance_score('seed', 'b kw') == 0.3
+
+
+def test_async_batch_leaves_out_unscored_keywords(client, cache):
+    async def create(**kwargs):
+        return _response(client.replies.pop(0))
+    
+    client.aclient = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    client.replies = ['{"b kw": 2}']
+    
+    scores = asyncio.run(client.batch_calculate_relevance_async('seed', ['a kw', 'b kw']))
+    assert scores == {'b kw': 1.0}
+    assert list(_stored(client, cache, 'seed', ['a kw', 'b kw'])) == ['b kw']
+
+
+class _SlowEmbedder:
+    """Embedder whose first use takes a while, like loading SentenceTransformer"""
+    
+    enabled = True
+    
+    def __init__(self):
+        self.loaded = threading.Event()
+    
+    def available(self):
+        if not self.loaded.is_set():
+            time.sleep(0.3)
+            self.loaded.set()
+        return True
+    
+    def encode(self, texts):
+        return np.tile(np.array([[1.0, 0.0]], dtype=np.float32), (len(texts), 1))
+
+
+def test_embedding_model_loads_off_the_event_loop():
+    client = GroqClient(api_key='test', embedder=_SlowEmbedder())
+    
+    async def main():
+        ticks = 0
+        
+        async def tick():
+            nonlocal ticks
+            while not client.embedder.loaded.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+        
+        ticker = asyncio.create_task(tick())
+        scores = await client.batch_calculate_relevance_async('seed', ['a kw'])
+        await ticker
+        return scores, ticks
+    
+    scores, ticks = asyncio.run(main())
+    assert scores == {'a kw': 1.0}
+    assert ticks > 5
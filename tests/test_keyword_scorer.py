@@ -0,0 +1,171 @@
+"""
+Tests for keyword scoring and top-N pruning
+"""
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from src.agents.keyword_scorer import KeywordScorer, TopNFilter
+
+
+@pytest.fixture
+def scorer():
+    return KeywordScorer()
+
+
+def _random_keywords(rng, count):
+    """Keywords with volume, relevance and a competition score the filter never sees"""
+    return [
+        {
+            'keyword': f'keyword {i}',
+            'estimated_volume': rng.choice([rng.randint(0, 1_000_000), 1000, 500, rng.randint(0, 2000)]),
+            'relevance_score': round(rng.uniform(0.5, 1.0), rng.choice([1, 2])),
+            'competition_score': rng.choice([rng.randint(0, 100), 50, 40])
+        }
+        for i in range(count)
+    ]
+
+
+def _filter(scorer, keywords, top_n):
+    """Feed keywords through a TopNFilter; return the analyzed keywords and the filter"""
+    top_filter = TopNFilter(scorer, top_n)
+    analyzed = []
+    for kw_data in keywords:
+        hidden = {key: value for key, value in kw_data.items() if key != 'competition_score'}
+        analyzed.extend(top_filter.add(hidden))
+    analyzed.extend(top_filter.drain())
+    return {kw_data['keyword'] for kw_data in analyzed}, top_filter
+
+
+def test_pruning_never_changes_the_top_n(scorer):
+    rng = random.Random(23)
+    pruned = 0
+    for _ in range(300):
+        keywords = _random_keywords(rng, rng.randint(1, 300))
+        top_n = rng.randint(1, 60)
+        
+        analyzed, top_filter = _filter(scorer, keywords, top_n)
+        assert len(analyzed) + top_filter.pruned == len(keywords)
+        pruned += top_filter.pruned
+        
+        full = scorer.rank_keywords(copy.deepcopy(keywords), top_n)
+        kept = scorer.rank_keywords(copy.deepcopy([kw for kw in keywords if kw['keyword'] in analyzed]), top_n)
+        assert [kw['keyword'] for kw in kept] == [kw['keyword'] for kw in full]
+    
+    assert pruned > 0
+
+
+def test_keywords_stream_when_pruning_is_impossible(scorer):
+    # Pipeline volumes stay within a few thousand, far inside the 40-point
+    # competition band of the default weights
+    rng = random.Random(1)
+    top_filter = TopNFilter(scorer, 5)
+    for i in range(100):
+        kw_data = {
+            'keyword': f'keyword {i}',
+            'estimated_volume': rng.choice([10, 100, 1000, 2000, 5000]),
+            'relevance_score': rng.uniform(0.5, 1.0)
+        }
+        assert top_filter.add(kw_data) == [kw_data]
+    
+    assert top_filter.drain() == []
+    assert top_filter.pruned == 0
+
+
+def test_hopeless_keyword_is_dropped(scorer):
+    top_filter = TopNFilter(scorer, 1)
+    strong = {'keyword': 'strong', 'estimated_volume': 10**8, 'relevance_score': 1.0}
+    weak = {'keyword': 'weak', 'estimated_volume': 0, 'relevance_score': 0.0}
+    
+    assert top_filter.add(strong) == [strong]
+    assert top_filter.add(weak) == []
+    assert top_filter.pruned == 1
+    assert top_filter.drain() == []
+
+
+def test_held_keyword_is_released_if_it_can_still_make_the_cut(scorer):
+    top_filter = TopNFilter(scorer, 2)
+    strong = {'keyword': 'strong', 'estimated_volume': 10**8, 'relevance_score': 1.0}
+    weak = {'keyword': 'weak', 'estimated_volume': 0, 'relevance_score': 0.0}
+    
+    top_filter.add(strong)
+    assert top_filter.add(weak) == []
+    assert top_filter.drain() == [weak]
+    assert top_filter.pruned == 0
+
+
+def test_vectorized_opportunity_scores_match_scalar(scorer):
+    rng = random.Random(7)
+    keywords = _random_keywords(rng, 5000)
+    
+    def vectorized(keywords):
+        return scorer._opportunity_scores(
+            np.array([kw['estimated_volume'] for kw in keywords], dtype=np.float64),
+            np.array([kw['competition_score'] for kw in keywords], dtype=np.float64),
+            np.array([kw['relevance_score'] for kw in keywords], dtype=np.float64)
+        ).tolist()
+    
+    assert vectorized(keywords) == [scorer.calculate_opportunity_score(kw) for kw in keywords]
+    
+    # Competition alone puts every score on x.xx5, where np.round and round() disagree
+    scorer.volume_weight, scorer.competition_weight, scorer.relevance_weight = 0.0, 1.0, 0.0
+    halves = [
+        {'estimated_volume': 0, 'competition_score': i / 1000, 'relevance_score': 0.5}
+        for i in range(5, 100000, 10)
+    ]
+    assert vectorized(halves) == [scorer.calculate_opportunity_score(kw) for kw in halves]
+
+
+def test_batch_difficulty_matches_scalar(scorer):
+    rng = random.Random(9)
+    analyses = [
+        {
+            'big_brands_count': rng.randint(0, 10),
+            'has_featured_snippet': rng.random() < 0.5,
+            'has_knowledge_graph': rng.random() < 0.5,
+            'has_ads': rng.random() < 0.5,
+            'total_results': rng.choice([0, 1_000_000, 1_000_001, 10_000_000, 10**8, 10**8 + 1, rng.randint(0, 10**9)])
+        }
+        for _ in range(2000)
+    ]
+    analyses += [{}, {'total_results': 5_000_000}, {'has_ads': True}]
+    
+    batch = scorer.calculate_keyword_difficulty_batch(analyses)
+    assert batch.tolist() == [scorer.calculate_keyword_difficulty(analysis) for analysis in analyses]
+
+
+def _reference_rank(scorer, keywords_data, top_n):
+    """Original rank_keywords: score every keyword, full stable sort, then slice"""
+    for kw_data in keywords_data:
+        kw_data['opportunity_score'] = scorer.calculate_opportunity_score(kw_data)
+        kw_data['keyword_difficulty'] = scorer.calculate_keyword_difficulty(kw_data)
+        kw_data['ranking_potential'] = scorer.estimate_ranking_potential(kw_data)
+    
+    sorted_keywords = sorted(keywords_data, key=lambda x: x['opportunity_score'], reverse=True)
+    for i, kw_data in enumerate(sorted_keywords[:top_n], 1):
+        kw_data['rank'] = i
+    return sorted_keywords[:top_n]
+
+
+def test_rank_keywords_matches_full_sort(scorer):
+    rng = random.Random(21)
+    for _ in range(200):
+        # Few distinct metric values force many ties around the N-th score
+        keywords = [
+            {
+                'keyword': f'keyword {i}',
+                'estimated_volume': rng.choice([100, 1000, 2500]),
+                'competition_score': rng.choice([20, 50, 80]),
+                'relevance_score': rng.choice([0.5, 0.8]),
+                'big_brands_count': rng.randint(0, 6),
+                'has_ads': rng.random() < 0.5,
+                'total_results': rng.randint(0, 10**9)
+            }
+            for i in range(rng.randint(0, 200))
+        ]
+        top_n = rng.randint(0, 80)
+        
+        expected = _reference_rank(scorer, copy.deepcopy(keywords), top_n)
+        assert scorer.rank_keywords(copy.deepcopy(keywords), top_n) == expected
@@ -0,0 +1,93 @@
+"""
+Tests for the SQLite key-value cache
+"""
+import types
+
+import pytest
+
+from src.cache import kv_cache
+from src.cache.kv_cache import KVCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for the cache's wall clock"""
+    now = types.SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(kv_cache, 'time', types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = KVCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.close()
+
+
+def test_round_trip(cache):
+    value = {'keyword': 'global internship', 'scores': [0.5, 1], 'nested': {'ok': True}, 'none': None}
+    cache.set('key', value)
+    
+    assert cache.get('key') == value
+    assert cache.get('missing') is None
+
+
+def test_get_many_returns_only_hits(cache):
+    cache.set_many({'a': 1, 'b': [2], 'c': 'three'})
+    
+    assert cache.get_many(['a', 'b', 'c', 'd']) == {'a': 1, 'b': [2], 'c': 'three'}
+
+
+def test_set_replaces_existing_value(cache):
+    cache.set('key', 1)
+    cache.set('key', 2)
+    
+    assert cache.get('key') == 2
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.set('short', 'value', ttl=60)
+    cache.set('forever', 'value')
+    
+    clock.value += 59
+    assert cache.get('short') == 'value'
+    
+    clock.value += 2
+    assert cache.get('short') is None
+    assert cache.get('forever') == 'value'
+
+
+def test_values_persist_across_connections(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first = KVCache(path)
+    first.set(KVCache.make_key('serp', 'global internship', 'us'), {'competition_score': 40})
+    first.close()
+    
+    second = KVCache(path)
+    assert second.get(KVCache.make_key('serp', 'global internship', 'us')) == {'competition_score': 40}
+    second.close()
+
+
+def test_expired_rows_are_deleted_on_open(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    first = KVCache(path)
+    first.set('short', 'value', ttl=60)
+    first.set('long', 'value', ttl=3600)
+    first.set('forever', 'value')
+    first.close()
+    
+    clock.value += 61
+    second = KVCache(path)
+    assert second._conn.execute('SELECT key FROM kv ORDER BY key').fetchall() == [('forever',), ('long',)]
+    assert second.purge_expired() == 0
+    
+    clock.value += 3600
+    assert second.purge_expired() == 1
+    assert second.get('forever') == 'value'
+    second.close()
+
+
+def test_make_key_depends_on_every_part():
+    assert KVCache.make_key('a', 'b') == KVCache.make_key('a', 'b')
+    assert KVCache.make_key('a', 'b') != KVCache.make_key('b', 'a')
+    assert KVCache.make_key('a', 1) != KVCache.make_key('a', 2)
@@ -0,0 +1,59 @@
+"""
+Tests for the store of keywords already scored for a seed
+"""
+import types
+
+import pytest
+
+from src.cache import kv_cache
+from src.cache.kv_cache import KVCache
+from src.cache.seen_store import SeenStore
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = KVCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.close()
+
+
+def _scored(keyword):
+    return {'keyword': keyword, 'relevance_score': 0.8, 'estimated_volume': 1000, 'competition_score': 40}
+
+
+def test_round_trip(cache):
+    store = SeenStore(cache, namespace=('United States', 'us', 'en'))
+    store.store_many('global internship', [_scored('summer internship'), _scored('paid internship')])
+    
+    found = store.fetch_many('global internship', ['summer internship', 'paid internship', 'new keyword'])
+    
+    assert found == {
+        'summer internship': _scored('summer internship'),
+        'paid internship': _scored('paid internship')
+    }
+
+
+def test_entries_are_scoped_by_seed_and_namespace(cache):
+    SeenStore(cache, namespace=('us',)).store_many('global internship', [_scored('summer internship')])
+    
+    assert SeenStore(cache, namespace=('us',)).fetch_many('remote jobs', ['summer internship']) == {}
+    assert SeenStore(cache, namespace=('uk',)).fetch_many('global internship', ['summer internship']) == {}
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    now = types.SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(kv_cache, 'time', types.SimpleNamespace(time=lambda: now.value))
+    store = SeenStore(cache, ttl=3600)
+    store.store_many('global internship', [_scored('summer internship')])
+    
+    now.value += 3599
+    assert 'summer internship' in store.fetch_many('global internship', ['summer internship'])
+    
+    now.value += 2
+    assert store.fetch_many('global internship', ['summer internship']) == {}
+
+
+def test_ttl_defaults_to_env_var(cache, monkeypatch):
+    monkeypatch.setenv('SEEN_TTL', '120')
+    
+    assert SeenStore(cache).ttl == 120
@@ -0,0 +1,133 @@
+"""
+Tests for the embedding-similarity cache
+"""
+import random
+import sys
+
+import numpy as np
+import pytest
+
+from src.cache.semantic_cache import SemanticCache
+
+
+WORDS = ['global', 'internship', 'summer', 'program', 'abroad', 'guide', 'best', 'students', 'apply', 'europe']
+DIMENSION = 32
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch):
+    """Force the NumPy backend even where FAISS is installed"""
+    monkeypatch.setitem(sys.modules, 'faiss', None)
+
+
+@pytest.fixture(params=['faiss', 'numpy'])
+def backend(request, monkeypatch):
+    """Run a test against each similarity backend available here"""
+    if request.param == 'faiss':
+        pytest.importorskip('faiss')
+    else:
+        monkeypatch.setitem(sys.modules, 'faiss', None)
+    return request.param
+
+
+def _entries(rng, count):
+    """Random keys with random embeddings"""
+    keys = [' '.join(rng.sample(WORDS, 3)) for _ in range(count)]
+    vectors = np.array([[rng.gauss(0, 1) for _ in range(DIMENSION)] for _ in range(count)], dtype=np.float32)
+    return keys, vectors
+
+
+def _queries(rng, keys, vectors, count):
+    """Near-paraphrases of stored entries mixed with unrelated queries"""
+    query_keys, query_vectors = _entries(rng, count)
+    for i in range(count):
+        if rng.random() < 0.6:
+            j = rng.randrange(len(keys))
+            query_keys[i] = keys[j]
+            query_vectors[i] = vectors[j] + np.array([rng.gauss(0, 0.1) for _ in range(DIMENSION)])
+    return query_keys, query_vectors
+
+
+def _reference_lookup(cache, keys, vectors, values, key, vector):
+    """One cosine scan per query over every entry"""
+    stored = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = vector / np.linalg.norm(vector)
+    similarities = stored @ query
+    best = int(similarities.argmax())
+    if similarities[best] < cache.threshold or not cache._same_entities(key, keys[best]):
+        return None
+    return values[best]
+
+
+def test_lookup_many_matches_per_query_scan(tmp_path, numpy_backend):
+    rng = random.Random(15)
+    keys, vectors = _entries(rng, 500)
+    values = [{'score': i} for i in range(len(keys))]
+    cache = SemanticCache(str(tmp_path / 'cache'), DIMENSION, threshold=0.95)
+    cache.add(keys, vectors, values)
+    
+    query_keys, query_vectors = _queries(rng, keys, vectors, 300)
+    found = cache.lookup_many(query_keys, query_vectors)
+    
+    expected = [
+        _reference_lookup(cache, keys, vectors, values, key, vector)
+        for key, vector in zip(query_keys, query_vectors)
+    ]
+    assert found == expected
+    assert any(value is not None for value in found)
+    assert any(value is None for value in found)
+
+
+def test_faiss_and_numpy_backends_agree(tmp_path, monkeypatch):
+    pytest.importorskip('faiss')
+    rng = random.Random(16)
+    keys, vectors = _entries(rng, 500)
+    values = list(range(len(keys)))
+    query_keys, query_vectors = _queries(rng, keys, vectors, 300)
+    
+    faiss_cache = SemanticCache(str(tmp_path / 'faiss'), DIMENSION)
+    faiss_cache.add(keys, vectors, values)
+    monkeypatch.setitem(sys.modules, 'faiss', None)
+    numpy_cache = SemanticCache(str(tmp_path / 'numpy'), DIMENSION)
+    numpy_cache.add(keys, vectors, values)
+    
+    assert faiss_cache.lookup_many(query_keys, query_vectors) == numpy_cache.lookup_many(query_keys, query_vectors)
+
+
+def test_distinguishing_tokens_never_share_results(tmp_path, numpy_backend):
+    cache = SemanticCache(str(tmp_path / 'cache'), DIMENSION)
+    vector = np.ones((1, DIMENSION), dtype=np.float32)
+    cache.add(['cpc rates'], vector, [0.9])
+    
+    assert cache.lookup('cpc rates', vector[0]) == 0.9
+    assert cache.lookup('cpm rates', vector[0]) is None
+
+
+def test_save_and_reload_round_trip(tmp_path, backend):
+    rng = random.Random(5)
+    keys, vectors = _entries(rng, 50)
+    values = [{'keywords': [key], 'rank': i} for i, key in enumerate(keys)]
+    cache = SemanticCache(str(tmp_path / 'cache'), DIMENSION)
+    cache.add(keys, vectors, values)
+    cache.save()
+    
+    reloaded = SemanticCache(str(tmp_path / 'cache'), DIMENSION)
+    
+    assert len(reloaded) == len(keys)
+    assert reloaded.lookup_many(keys, vectors) == cache.lookup_many(keys, vectors)
+
+
+def test_eviction_drops_least_recently_used(tmp_path, backend):
+    rng = random.Random(7)
+    _, vectors = _entries(rng, 4)
+    keys = ['global internship', 'summer program', 'abroad guide', 'best students']
+    cache = SemanticCache(str(tmp_path / 'cache'), DIMENSION, max_entries=3, evict_every=1)
+    cache.add(keys[:3], vectors[:3], [0, 1, 2])
+    
+    # Touch the oldest entry so the second one becomes least recently used
+    assert cache.lookup(keys[0], vectors[0]) == 0
+    cache.add(keys[3:], vectors[3:], [3])
+    
+    assert len(cache) == 3
+    assert cache.lookup(keys[1], vectors[1]) is None
+    assert [cache.lookup(keys[i], vectors[i]) for i in (0, 2, 3)] == [0, 2, 3]
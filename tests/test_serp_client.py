@@ -0,0 +1,159 @@
+"""
+Tests for SERP competition analysis
+"""
+import random
+
+import pytest
+
+from src.clients.serp_client import HIGH_AUTHORITY_DOMAINS, SerpClient, _is_big_brand
+
+
+DOMAINS = [
+    'en.wikipedia.org', 'x.com', 'amazon.com', 'reddit.com', 'foo.org',
+    'https://www.linkedin.com › jobs', 'github.com', 'medium.com'
+]
+TOTALS = [
+    0, 100000, 100001, 10**6, 10**6 + 1, 10**7, 5 * 10**7,
+    10**8, 10**8 + 1, 10**9
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('SERP_API_KEY', 'test')
+    return SerpClient()
+
+
+def _reference_analysis(keyword, results):
+    """Per-keyword scoring as it was before batch scoring with NumPy"""
+    organic_results = results.get('organic_results', [])[:10]
+    analysis = {
+        'keyword': keyword,
+        'total_results': results.get('search_information', {}).get('total_results', 0),
+        'organic_results_count': len(organic_results),
+        'big_brands_count': 0,
+        'has_featured_snippet': 'featured_snippet' in results or 'answer_box' in results,
+        'has_knowledge_graph': 'knowledge_graph' in results,
+        'has_ads': 'ads' in results or 'top_ads' in results,
+        'serp_features_count': 0,
+        'domains': [],
+        'competition_score': 0,
+        'first_page_probability': 0.0
+    }
+    
+    for result in organic_results:
+        domain = result.get('domain', result.get('displayed_link', ''))
+        analysis['domains'].append(domain)
+        if _is_big_brand(domain):
+            analysis['big_brands_count'] += 1
+    
+    for feature in ('has_featured_snippet', 'has_knowledge_graph', 'has_ads'):
+        if analysis[feature]:
+            analysis['serp_features_count'] += 1
+    
+    score = min(analysis['big_brands_count'] * 10, 50)
+    score += 10 * analysis['serp_features_count']
+    total_results = analysis['total_results']
+    if total_results > 100000000:
+        score += 20
+    elif total_results > 10000000:
+        score += 15
+    elif total_results > 1000000:
+        score += 10
+    elif total_results > 100000:
+        score += 5
+    analysis['competition_score'] = min(score, 100)
+    
+    if score < 20:
+        base_prob = 0.85
+    elif score < 40:
+        base_prob = 0.65
+    elif score < 60:
+        base_prob = 0.45
+    elif score < 80:
+        base_prob = 0.25
+    else:
+        base_prob = 0.10
+    brand_penalty = min(analysis['big_brands_count'] * 0.08, 0.30)
+    feature_penalty = min(analysis['serp_features_count'] * 0.05, 0.20)
+    analysis['first_page_probability'] = round(max(base_prob - brand_penalty - feature_penalty, 0.05), 2)
+    
+    return analysis
+
+
+def _random_results(rng):
+    """Random search response covering every scoring threshold"""
+    results = {
+        'organic_results': [{'domain': rng.choice(DOMAINS)} for _ in range(rng.randint(0, 12))],
+        'search_information': {
+            'total_results': rng.choice(TOTALS + [rng.randint(0, 10**9)])
+        }
+    }
+    for feature in ('answer_box', 'knowledge_graph', 'ads', 'top_ads', 'featured_snippet'):
+        if rng.random() < 0.3:
+            results[feature] = {}
+    if rng.random() < 0.1:
+        del results['search_information']
+    return results
+
+
+def test_batch_scoring_matches_per_keyword_scoring(client):
+    rng = random.Random(19)
+    searches = [_random_results(rng) for _ in range(2000)]
+    
+    expected = [_reference_analysis(f'kw {i}', results) for i, results in enumerate(searches)]
+    batched = client._score_competition(
+        [client._serp_features(f'kw {i}', results) for i, results in enumerate(searches)]
+    )
+    single = [client._build_competition_analysis(f'kw {i}', results) for i, results in enumerate(searches)]
+    
+    assert batched == expected
+    assert single == expected
+
+
+def test_batch_scoring_returns_plain_python_numbers(client):
+    analysis = client._build_competition_analysis('kw', _random_results(random.Random(1)))
+    
+    assert type(analysis['competition_score']) is int
+    assert type(analysis['first_page_probability']) is float
+
+
+def _reference_is_big_brand(domain):
+    """Label-list suffix walk, before labels were peeled in place"""
+    host = domain.lower().split('://', 1)[-1]
+    host = host.split('/', 1)[0].split(' ', 1)[0].split(':', 1)[0]
+    labels = host.split('.')
+    return any('.'.join(labels[i:]) in HIGH_AUTHORITY_DOMAINS for i in range(len(labels) - 1))
+
+
+def _random_host(rng):
+    """Random host built from authority labels, look-alikes and noise"""
+    labels = ['www', 'en', 'm', 'amazon', 'notamazon', 'wikipedia', 'com', 'org', 'co', 'uk', 'net', 'x']
+    host = '.'.join(rng.choice(labels) for _ in range(rng.randint(0, 4)))
+    # No country-code TLD: those hosts also match regional authorities
+    host = (host + '.' if host else '') + rng.choice(['com', 'org', 'net'])
+    if rng.random() < 0.3:
+        host = rng.choice(['https://', 'http://']) + host + rng.choice(['', '/path', ' › jobs', ':443'])
+    return host
+
+
+def test_suffix_walk_matches_label_walk():
+    rng = random.Random(22)
+    for _ in range(20000):
+        host = _random_host(rng)
+        assert _is_big_brand(host) == _reference_is_big_brand(host), host
+
+
+@pytest.mark.parametrize('domain, expected', [
+    ('en.wikipedia.org', True),
+    ('https://www.linkedin.com › jobs', True),
+    ('amazon.com.br', True),
+    ('https://www.amazon.com.au/dp/1', True),
+    ('notamazon.com', False),
+    ('amazon.co.uk', False),
+    ('example.com.br', False),
+    ('amazon.com.evil.net', False),
+    ('com', False),
+])
+def test_is_big_brand(domain, expected):
+    assert _is_big_brand(domain) is expected
@@ -0,0 +1,116 @@
+"""
+Tests for Google Trends interest summaries
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.clients.trends_client import TrendsClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('GOOGLE_TRENDS_ENABLED', 'false')
+    return TrendsClient()
+
+
+def _reference_summary(series):
+    """pandas summary, as computed before the NumPy reductions"""
+    recent = series.tail(3).mean()
+    older = series.head(3).mean()
+    if recent > older * 1.2:
+        trend = 'rising'
+    elif recent < older * 0.8:
+        trend = 'declining'
+    else:
+        trend = 'stable'
+    
+    return {
+        'average_interest': int(series.mean()),
+        'trend': trend,
+        'max_interest': int(series.max()),
+        'min_interest': int(series.min())
+    }
+
+
+def test_numpy_summary_matches_pandas(client):
+    rng = random.Random(20)
+    for _ in range(2000):
+        length = rng.choice([1, 2, 3, 5, 52, 53])
+        if rng.random() < 0.5:
+            values = [rng.randint(0, 100) for _ in range(length)]
+        else:
+            values = [round(rng.uniform(0, 100), 3) for _ in range(length)]
+        series = pd.Series(values)
+        
+        assert client._summarize_interest(series.to_numpy()) == _reference_summary(series), values
+
+
+def test_summary_returns_plain_python_ints(client):
+    summary = client._summarize_interest(np.array([10, 20, 30, 40]))
+    
+    assert all(type(summary[key]) is int for key in ('average_interest', 'max_interest', 'min_interest'))
+
+
+class _FakeTrendReq:
+    """pytrends stand-in scaling every payload against its own peak, like Google does"""
+    
+    raw = {
+        'niche kw': np.array([10, 20, 15, 12, 30, 25] * 9, dtype=float),
+        'popular kw': np.full(54, 300.0)
+    }
+    payloads = []
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def build_payload(self, keywords, timeframe=None):
+        self.keywords = list(keywords)
+        self.payloads.append(self.keywords)
+    
+    def interest_over_time(self):
+        peak = max(self.raw[keyword].max() for keyword in self.keywords)
+        return pd.DataFrame({keyword: np.round(self.raw[keyword] * 100 / peak) for keyword in self.keywords})
+
+
+def test_batched_interest_never_answers_single_lookups(tmp_path, monkeypatch):
+    from src.cache.kv_cache import KVCache
+    from src.clients import trends_client
+    
+    monkeypatch.setenv('TRENDS_RPM', '0')
+    monkeypatch.setattr(trends_client, 'TrendReq', _FakeTrendReq)
+    monkeypatch.setattr(_FakeTrendReq, 'payloads', [])
+    cache = KVCache(str(tmp_path / 'cache.sqlite'))
+    client = TrendsClient(cache=cache)
+    
+    client.batch_interest_over_time(['popular kw', 'niche kw'])
+    single = client.get_interest_over_time('niche kw')
+    
+    # Quantized against the popular keyword, the niche series would lose precision
+    assert single == client._summarize_interest(_FakeTrendReq.raw['niche kw'] * 100 / 30)
+    assert _FakeTrendReq.payloads == [['popular kw', 'niche kw'], ['niche kw']]
+    
+    # A later run reuses both kinds from the cache, preferring single-keyword results
+    reloaded = TrendsClient(cache=cache)
+    assert reloaded.get_interest_over_time('niche kw') == single
+    assert reloaded.batch_interest_over_time(['niche kw', 'popular kw'])['niche kw'] == single
+    assert len(_FakeTrendReq.payloads) == 2
+    cache.close()
+
+
+def test_interest_memo_is_a_bounded_lru(monkeypatch):
+    from src.clients import trends_client
+    
+    monkeypatch.setenv('GOOGLE_TRENDS_ENABLED', 'false')
+    monkeypatch.setattr(trends_client, 'MEMO_MAXSIZE', 3)
+    client = TrendsClient()
+    
+    client._store_interest({'a': {'average_interest': 1}, 'b': {'average_interest': 2}, 'c': {'average_interest': 3}})
+    assert client._cached_interest(['a']) == {'a': {'average_interest': 1}}
+    
+    # 'b' is now the least recently used entry and makes room for 'd'
+    client._store_interest({'d': {'average_interest': 4}})
+    assert len(client._interest) == 3
+    assert set(client._cached_interest(['a', 'b', 'c', 'd'])) == {'a', 'c', 'd'}
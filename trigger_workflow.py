@@ -1,5 +1,5 @@
-import requests
-import json
+from src.clients.http_session import create_session
+from src.utils import fast_json
 
 # Your N8N webhook URL
 url = "http://localhost:5678/webhook/keyword-research"
@@ -12,18 +12,21 @@ data = {
 
 print("🚀 Triggering N8N workflow...")
 print(f"URL: {url}")
-print(f"Input: {json.dumps(data, indent=2)}\n")
+print(f"Input: {fast_json.dumps(data, indent=True).decode('utf-8')}\n")
 
 try:
-    response = requests.post(url, json=data, timeout=300)
-    result = response.json()
+    # Keep-alive session with retries on connection errors
+    with create_session() as session:
+        response = session.post(url, json=data, timeout=300)
+    result = fast_json.loads(response.content)
+    output = fast_json.dumps(result, indent=True)
     
     print("✅ Success!\n")
-    print(json.dumps(result, indent=2))
+    print(output.decode('utf-8'))
     
     # Save results
-    with open('workflow_results.json', 'w') as f:
-        json.dump(result, f, indent=2)
+    with open('workflow_results.json', 'wb') as f:
+        f.write(output)
     
     print("\n💾 Results saved to: workflow_results.json")
     